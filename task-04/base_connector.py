@@ -0,0 +1,1063 @@
+import base64
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from itertools import islice
+
+from connection_pool import ConnectionPool, PoolError
+from metrics import BatchSizeTuner, LatencyHistogram
+from query_cache import QueryCache, written_table
+
+# Columns of the movies table other than id, in insert order.
+MOVIE_COLUMNS = ["series_title", "released_year", "genre", "imdb_rating", "director", "star1", "star2", "star3"]
+
+# What a movie search may select: any movies column, or the row count for count_movies().
+SELECT_COLUMNS = {"id", *MOVIE_COLUMNS, "COUNT(*)"}
+
+# Index-backed lookups used when the normalized people/genre tables exist:
+# (movie ids subquery, name id column, word table). Every genre and person name
+# is also stored word by word, and a name matches when each word of the search
+# term starts one of its words ('nolan' and 'chris nol' find Christopher Nolan,
+# 'olan' does not). Each term word is a prefix range scan on the word table's
+# primary key, and the join tables' keys then lead to the movies, so the cost
+# grows with the matches rather than with the number of names.
+NORMALIZED_LOOKUPS = {
+    "genre": ("SELECT movie_id FROM movie_genres WHERE", "genre_id", "genre_words"),
+    "director": ("SELECT movie_id FROM movie_people WHERE role = 'director' AND", "person_id", "person_words"),
+    "star": ("SELECT movie_id FROM movie_people WHERE role = 'star' AND", "person_id", "person_words"),
+}
+NORMALIZED_COLUMNS = {"genre": "genre", "director": "director", "star1": "star", "star2": "star", "star3": "star"}
+NORMALIZED_TABLES = ("genres", "people", "movie_genres", "movie_people", "genre_words", "person_words")
+
+# Words of a genre or person name as stored in the word tables: letters and digits
+# (no '_', which LIKE would treat as a wildcard), casefolded, at most 100 characters.
+NAME_WORD = re.compile(r"[^\W_]+")
+
+def name_words(name):
+    return [word[:100] for word in NAME_WORD.findall(name.casefold())] if name else []
+
+# Tables movie searches read; writing to any of them invalidates the result cache.
+CACHED_TABLES = ("movies",) + NORMALIZED_TABLES
+
+# Numeric columns that accept range filters, with the placeholder used for a bound.
+# imdb_rating is a FLOAT, so bounds are cast to FLOAT too; otherwise 8.1 stored as
+# single precision compares greater than the double 8.1 and drops out of "<= 8.1".
+RANGE_COLUMNS = {
+    "released_year": "%s",
+    "imdb_rating": "CAST(%s AS FLOAT)",
+}
+
+# Column lists of the FULLTEXT indexes; MATCH() must name exactly an indexed list.
+FULLTEXT_FIELDS = {
+    "title": "series_title",
+    "all": "series_title, director, star1, star2, star3",
+}
+
+# Criteria movie_search() can combine: text fields -> the movies columns they match,
+# numeric fields -> their range column.
+SEARCH_FIELDS = {
+    "genre": ["genre"],
+    "director": ["director"],
+    "actor": ["star1", "star2", "star3"],
+}
+RANGE_FIELDS = {"year": "released_year", "rating": "imdb_rating"}
+
+def movie_search(genre=None, director=None, actor=None, year=None, rating=None, title=None, keyword=None):
+    """
+    Combine search criteria into keyword arguments for fetch_movies(),
+    fetch_movies_page(), iter_movies() or count_movies(). Every given criterion
+    must match, and the connector runs them as a single query.
+
+    Args:
+        genre, director, actor (str): Matched like a single-field search (by word
+            prefix on the normalized tables, substring otherwise); actor covers
+            star1..star3.
+        year, rating (tuple): Inclusive (low, high) bounds; either may be None.
+        title (str): Full-text search on the title.
+        keyword (str): Boolean-mode full-text search over title, director and stars.
+
+    Returns:
+        dict: Arguments without columns; empty if no criterion was given.
+    """
+    if title and keyword:
+        raise ValueError("Combine title or keyword, not both: there is one full-text condition per query.")
+    names = {"genre": genre, "director": director, "actor": actor}
+    query = {}
+    searches = [(SEARCH_FIELDS[name], value) for name, value in names.items() if value]
+    if searches:
+        query["search_filters"] = searches
+    ranges = {RANGE_FIELDS[name]: bounds for name, bounds in (("year", year), ("rating", rating))
+              if bounds and bounds != (None, None)}
+    if ranges:
+        query["range_filters"] = ranges
+    if title:
+        query["text_query"] = title
+        query["text_fields"] = "title"
+    elif keyword:
+        query["text_query"] = keyword
+        query["boolean_mode"] = True
+    return query
+
+@dataclass
+class BatchInsertResult:
+    """Outcome of batch_insert() / insert_batches()."""
+    rows_inserted: int = 0
+    batches_committed: int = 0
+    failed_batches: list = field(default_factory=list)
+    seconds: float = 0.0
+    execute_seconds: float = 0.0
+    commit_seconds: float = 0.0
+    latencies: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_inserted / self.seconds if self.seconds > 0 else 0.0
+
+    def merge(self, other):
+        """Fold another result (e.g. from a parallel writer) into this one."""
+        self.rows_inserted += other.rows_inserted
+        self.batches_committed += other.batches_committed
+        self.failed_batches.extend(other.failed_batches)
+        self.seconds = max(self.seconds, other.seconds)
+        self.execute_seconds += other.execute_seconds
+        self.commit_seconds += other.commit_seconds
+        self.latencies.merge(other.latencies)
+
+def is_read_query(sql):
+    """True for plain SELECTs, which are safe to run again after a lost connection."""
+    return sql.lstrip()[:6].upper() == "SELECT"
+
+class QueryHandle:
+    """
+    Lets another thread cancel a running fetch_movies() / fetch_movies_page() call.
+
+    Pass a handle to the fetch and call the connector's cancel_query(handle) from
+    any thread; the statement is interrupted on the server and the fetch returns
+    as if it had failed. Cancelling before the query starts skips it.
+    """
+
+    def __init__(self):
+        self.cancelled = False
+        self.connection = None   # connection the query is running on, if any
+        self.lock = threading.Lock()
+
+    def attach(self, connection):
+        """Record the connection about to run the query. False if already cancelled."""
+        with self.lock:
+            if self.cancelled:
+                return False
+            self.connection = connection
+            return True
+
+    def detach(self):
+        # Taking the lock waits out a cancel in progress, so an interrupt never
+        # reaches the connection after it goes back to the pool.
+        with self.lock:
+            self.connection = None
+
+class BaseConnector:
+    """
+    Query, streaming, paging and batch-insert logic shared by every backend.
+
+    SQL is written with %s placeholders; subclasses supply the driver (connection
+    opening, error classes, placeholder style) and the schema DDL for their dialect.
+    """
+
+    display_name = "database"
+    driver_errors = ()          # the driver's base exception class(es)
+    connection_lost_errors = () # errors after which a pooled connection is dropped
+    supports_load_data = False  # LOAD DATA LOCAL INFILE
+    upsert_sql = None           # incremental-import upsert of movies + row_hash
+    health_check_interval = 30  # idle seconds after which a connection is pinged before reuse
+
+    def __init__(self, pool_size=None, pool_max_lifetime=3600, pool_timeout=10, normalized=False,
+                 cache_size=None, cache_ttl=60, statement_cache_size=None):
+        """
+        Args:
+            pool_size (int): If set, use a bounded connection pool of this size
+                instead of a single shared connection.
+            pool_max_lifetime (float): Seconds before a pooled connection is recycled.
+            pool_timeout (float): Seconds to wait for a free pooled connection.
+            normalized (bool): Answer genre/director/star searches from the normalized
+                genres/people join tables instead of LIKE scans over the movies table.
+            cache_size (int): If set, keep up to this many fetch_movies() /
+                fetch_movies_page() results in an LRU cache.
+            cache_ttl (float): Seconds a cached result is reused.
+            statement_cache_size (int): Prepared statements kept per connection for
+                execute_query() / fetch_movies(); None for the driver's default.
+        """
+        self.connection = None
+        self.pool = None
+        self.pool_size = pool_size
+        self.pool_max_lifetime = pool_max_lifetime
+        self.pool_timeout = pool_timeout
+        self.normalized = normalized
+        self.cache = QueryCache(cache_size, cache_ttl) if cache_size else None
+        self.statement_cache_size = statement_cache_size
+        # Liveness of the shared (unpooled) connection: trusted until a query
+        # fails with a connection error, pinged only after sitting idle.
+        self._last_used = 0.0
+        self._connection_lost = False
+
+    @property
+    def db_errors(self):
+        return tuple(self.driver_errors) + (PoolError,)
+
+    # --- driver hooks -------------------------------------------------------
+
+    def _open_connection(self):
+        raise NotImplementedError
+
+    def _connection_alive(self, connection):
+        return True
+
+    def _prepare(self, sql):
+        """Translate %s placeholders into the driver's style."""
+        return sql
+
+    def _stream_cursor(self, connection):
+        return connection.cursor()
+
+    def _abandon_stream(self, connection, cursor):
+        """Clean up a stream_query() cursor whose generator was closed early."""
+        cursor.close()
+
+    def _has_unread_result(self, connection):
+        return False
+
+    def _fetch_rows(self, connection, sql, params):
+        """Run a query on connection and return all its rows; sql is already _prepare()d."""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(sql, params or ())
+            return cursor.fetchall()
+        finally:
+            cursor.close()
+
+    def _count_tables_sql(self, names):
+        raise NotImplementedError
+
+    def _count_columns_sql(self, table, names):
+        raise NotImplementedError
+
+    def _interrupt(self, connection):
+        """Stop the statement running on connection; called from another thread."""
+        raise NotImplementedError
+
+    def _text_condition(self, text_query, text_fields, boolean_mode):
+        raise NotImplementedError
+
+    def _create_staging_tables(self, cursor):
+        cursor.execute("CREATE TEMPORARY TABLE staging_genres (movie_id INT NOT NULL, name VARCHAR(100) NOT NULL)")
+        cursor.execute("CREATE TEMPORARY TABLE staging_genre_words (name VARCHAR(100) NOT NULL, word VARCHAR(100) NOT NULL)")
+        cursor.execute("CREATE TEMPORARY TABLE staging_person_words (name VARCHAR(255) NOT NULL, word VARCHAR(100) NOT NULL)")
+        cursor.execute("""
+            CREATE TEMPORARY TABLE staging_people (
+                movie_id INT NOT NULL,
+                name VARCHAR(255) NOT NULL,
+                role VARCHAR(10) NOT NULL
+            )
+        """)
+
+    def _drop_staging_tables(self, cursor):
+        cursor.execute("DROP TABLE IF EXISTS staging_genres")
+        cursor.execute("DROP TABLE IF EXISTS staging_people")
+        cursor.execute("DROP TABLE IF EXISTS staging_genre_words")
+        cursor.execute("DROP TABLE IF EXISTS staging_person_words")
+
+    insert_ignore = "INSERT IGNORE"
+
+    # --- schema -------------------------------------------------------------
+
+    def create_movies_table(self):
+        """
+        Create movies, its updated_at change-tracking column and its secondary
+        indexes if they do not exist.
+        """
+        raise NotImplementedError
+
+    def ensure_incremental_schema(self):
+        """Add the row_hash column and the (series_title, year or 0) unique key."""
+        raise NotImplementedError
+
+    def create_normalized_tables(self):
+        """Create the genre/people lookup tables and their join tables."""
+        raise NotImplementedError
+
+    def populate_normalized_tables(self, batch_size=1000, changed_since=None):
+        """
+        Fill genres/people, their word tables and the join tables from the rows
+        already in movies.
+
+        Names are split out in Python page by page into temporary staging tables,
+        then resolved to ids with set-based INSERT ... SELECT joins so the
+        database's collation decides which names are equal. Safe to re-run.
+
+        Args:
+            batch_size (int): Movies read per page.
+            changed_since (str): A movies_change_stamp(); only movies inserted or
+                updated since it are relinked. Rows carrying the stamp itself are
+                relinked again, so writes in the same clock tick are not missed.
+                None relinks every movie.
+        """
+        with self.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                self._create_staging_tables(cursor)
+
+                sql = "SELECT id, genre, director, star1, star2, star3 FROM movies WHERE id > %s"
+                if changed_since is not None:
+                    sql += " AND updated_at >= %s"
+                sql += " ORDER BY id LIMIT %s"
+                last_id = 0
+                while True:
+                    params = (last_id, changed_since, batch_size) if changed_since is not None else (last_id, batch_size)
+                    cursor.execute(self._prepare(sql), params)
+                    rows = cursor.fetchall()
+                    if not rows:
+                        break
+
+                    genre_rows = []
+                    people_rows = []
+                    for movie_id, genre, director, *stars in rows:
+                        for name in (genre or "").split(","):
+                            if name.strip():
+                                genre_rows.append((movie_id, name.strip()))
+                        if director and director.strip():
+                            people_rows.append((movie_id, director.strip(), "director"))
+                        for star in stars:
+                            if star and star.strip():
+                                people_rows.append((movie_id, star.strip(), "star"))
+
+                    genre_words = {(name, word) for _, name in genre_rows for word in name_words(name)}
+                    person_words = {(name, word) for _, name, _ in people_rows for word in name_words(name)}
+
+                    if genre_rows:
+                        cursor.executemany(self._prepare(
+                            "INSERT INTO staging_genres (movie_id, name) VALUES (%s, %s)"), genre_rows)
+                        cursor.executemany(self._prepare(
+                            "INSERT INTO staging_genre_words (name, word) VALUES (%s, %s)"), list(genre_words))
+                    if people_rows:
+                        cursor.executemany(self._prepare(
+                            "INSERT INTO staging_people (movie_id, name, role) VALUES (%s, %s, %s)"), people_rows)
+                        cursor.executemany(self._prepare(
+                            "INSERT INTO staging_person_words (name, word) VALUES (%s, %s)"), list(person_words))
+                    last_id = rows[-1][0]
+
+                # Re-link staged movies from scratch so upserted rows lose stale genres/people.
+                cursor.execute("DELETE FROM movie_genres WHERE movie_id IN (SELECT movie_id FROM staging_genres)")
+                cursor.execute("DELETE FROM movie_people WHERE movie_id IN (SELECT movie_id FROM staging_people)")
+                cursor.execute(f"{self.insert_ignore} INTO genres (name) SELECT DISTINCT name FROM staging_genres")
+                cursor.execute(f"{self.insert_ignore} INTO people (name) SELECT DISTINCT name FROM staging_people")
+                cursor.execute(f"""
+                    {self.insert_ignore} INTO genre_words (word, genre_id)
+                    SELECT DISTINCT s.word, g.id FROM staging_genre_words s JOIN genres g ON g.name = s.name
+                """)
+                cursor.execute(f"""
+                    {self.insert_ignore} INTO person_words (word, person_id)
+                    SELECT DISTINCT s.word, p.id FROM staging_person_words s JOIN people p ON p.name = s.name
+                """)
+                cursor.execute(f"""
+                    {self.insert_ignore} INTO movie_genres (movie_id, genre_id)
+                    SELECT s.movie_id, g.id FROM staging_genres s JOIN genres g ON g.name = s.name
+                """)
+                cursor.execute(f"""
+                    {self.insert_ignore} INTO movie_people (movie_id, person_id, role)
+                    SELECT s.movie_id, p.id, s.role FROM staging_people s JOIN people p ON p.name = s.name
+                """)
+                connection.commit()
+                self._invalidate_cache()
+            finally:
+                self._drop_staging_tables(cursor)
+                cursor.close()
+
+    # --- connection management ---------------------------------------------
+
+    def connect(self):
+        """Establish connection to the database."""
+        try:
+            if self.pool_size:
+                self.pool = ConnectionPool(
+                    self._open_connection,
+                    max_size=self.pool_size,
+                    max_lifetime=self.pool_max_lifetime,
+                    checkout_timeout=self.pool_timeout,
+                    health_check_interval=self.health_check_interval,
+                    is_alive=self._connection_alive
+                )
+                # Open the first connection up front so bad credentials fail here.
+                self.pool.checkin(self.pool.checkout())
+                print(f"Connected to {self.display_name} (pool of up to {self.pool_size} connections)")
+                return True
+
+            self.connection = self._open_connection()
+            if self._connection_alive(self.connection):
+                self._last_used = time.monotonic()
+                self._connection_lost = False
+                print(f"Connected to {self.display_name}")
+                return True
+            else:
+                return False
+        except self.db_errors as e:
+            print(f"Error connecting to {self.display_name}: {e}")
+            return False
+
+    def disconnect(self):
+        """Close the database connection."""
+        if self.pool:
+            self.pool.close()
+        if self.connection is not None:
+            self._close_quietly(self.connection)
+        self.connection = None
+
+    def is_connected(self):
+        """
+        Check that connect() succeeded and disconnect() has not been called.
+
+        This costs no round-trip: a connection that died is noticed when it is
+        next used (see checkout()) and replaced.
+        """
+        if self.pool:
+            return not self.pool.closed
+        return self.connection is not None
+
+    def _close_quietly(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _revive_connection(self):
+        """
+        Replace the shared connection if it failed, or if it sat idle for
+        health_check_interval seconds and no longer answers a ping.
+        """
+        if not self._connection_lost and self._connection_alive(self.connection):
+            return
+        self._close_quietly(self.connection)
+        self.connection = self._open_connection()
+        self._connection_lost = False
+
+    @contextmanager
+    def checkout(self):
+        """
+        Borrow a connection for the duration of a with-block.
+
+        In pooled mode the connection comes from the pool and is returned on exit;
+        otherwise the single shared connection is used. Either way a connection is
+        only pinged when it has been idle for health_check_interval seconds, and
+        one that fails with a connection error is replaced on the next checkout.
+        """
+        if self.pool is None:
+            if self._connection_lost or time.monotonic() - self._last_used > self.health_check_interval:
+                self._revive_connection()
+            try:
+                yield self.connection
+            except Exception as e:
+                if self._is_connection_lost(e):
+                    self._connection_lost = True
+                raise
+            finally:
+                self._last_used = time.monotonic()
+            return
+
+        connection = self.pool.checkout()
+        try:
+            yield connection
+        except Exception as e:
+            if self._is_connection_lost(e):
+                self.pool.checkin(connection, discard=True)
+                # The server may have dropped the other idle connections too.
+                self.pool.recheck_idle()
+                connection = None
+            raise
+        finally:
+            if connection is not None:
+                # A connection abandoned mid-stream still has unread rows on the
+                # wire; dropping it is cheaper than draining the result set.
+                self.pool.checkin(connection, discard=self._has_unread_result(connection))
+
+    def has_normalized_schema(self):
+        """Check whether the normalized genre/people tables exist and are populated."""
+        rows = self.execute_query(self._count_tables_sql(NORMALIZED_TABLES))
+        if not rows or rows[0][0] < len(NORMALIZED_TABLES):
+            return False
+        rows = self.execute_query("SELECT 1 FROM movie_genres LIMIT 1")
+        return bool(rows)
+
+    def movies_version(self):
+        """
+        Cheap change stamp for the movies table, for callers that cache its contents.
+
+        Returns:
+            tuple: (row count, max id, backend modification stamp or None), or None
+            if the query failed. Any insert, delete or (where the backend tracks
+            modification time) update changes the value.
+        """
+        rows = self.execute_query("SELECT COUNT(*), MAX(id) FROM movies")
+        if not rows:
+            return None
+        count, max_id = rows[0]
+        return count, max_id, self._movies_modified()
+
+    def _movies_modified(self):
+        return None
+
+    def has_change_tracking(self):
+        """Check whether movies has the updated_at column added by create_movies_table()."""
+        rows = self.execute_query(self._count_columns_sql("movies", ["updated_at"]))
+        return bool(rows) and rows[0][0] == 1
+
+    def movies_change_stamp(self):
+        """
+        Latest updated_at in movies. Rows inserted or updated after this call get
+        a later stamp, so passing it to fetch_movies_changed() later returns them.
+        A write stamped in the same clock tick, or committed long after its
+        statement started, can be missed; a missed insert still shows in the
+        row count.
+
+        Returns:
+            str: The stamp, or None if the table is empty, untracked or on error.
+        """
+        if not self.has_change_tracking():
+            return None
+        rows = self.execute_query("SELECT MAX(updated_at) FROM movies")
+        if not rows or rows[0][0] is None:
+            return None
+        return str(rows[0][0])
+
+    def fetch_movies_changed(self, since, columns=None):
+        """
+        Fetch movies inserted or updated after a movies_change_stamp().
+        Deleted rows leave no trace; compare row counts to detect them.
+
+        Returns:
+            list: Rows of the requested columns in id order, or None if error.
+        """
+        columns = columns or MOVIE_COLUMNS
+        return self.execute_query(
+            f"SELECT {', '.join(columns)} FROM movies WHERE updated_at > %s ORDER BY id", (since,)
+        )
+
+    def cancel_query(self, handle):
+        """
+        Cancel the query started with handle, or mark it cancelled if it has not
+        started yet. Safe to call from any thread, and more than once.
+        """
+        with handle.lock:
+            handle.cancelled = True
+            if handle.connection is None:
+                return
+            try:
+                self._interrupt(handle.connection)
+            except self.db_errors as e:
+                print(f"Cancel query error: {e}")
+
+    def pool_stats(self):
+        """Return pool usage and wait metrics, or None when not pooled."""
+        return self.pool.stats() if self.pool else None
+
+    def cache_stats(self):
+        """Return result cache hit/miss counters, or None when not caching."""
+        return self.cache.stats() if self.cache else None
+
+    def _invalidate_cache(self, sql=None):
+        """Drop cached results, or only if sql writes to a table they were read from."""
+        if self.cache is not None and (sql is None or written_table(sql) in CACHED_TABLES):
+            self.cache.invalidate()
+
+    # --- queries ------------------------------------------------------------
+
+    def execute_query(self, query, params=None):
+        """
+        Execute a SQL query with optional parameters.
+
+        Args:
+            query (str): The SQL query to be executed, with %s placeholders.
+            params (tuple or list): Optional parameters for the query.
+
+        Returns:
+            list: Fetched results as list of tuples or None if error occurs.
+        """
+        if not self.is_connected():
+            print("Database not connected.")
+            return None
+
+        retry = is_read_query(query)
+        while True:
+            try:
+                with self.checkout() as connection:
+                    return self._fetch_rows(connection, self._prepare(query), params)
+            except self.db_errors as e:
+                if self._should_retry(e, retry):
+                    retry = False
+                    continue
+                print(f"Query execution error: {e}")
+                return None
+
+    def _is_connection_lost(self, error):
+        """Whether error means the connection itself is gone and must be replaced."""
+        return isinstance(error, self.connection_lost_errors)
+
+    def _should_retry(self, error, retry, handle=None):
+        """
+        Whether to run a read again after error: only once, only for a lost
+        connection (checkout() has then arranged a fresh one), never when cancelled.
+        """
+        if not retry or not self._is_connection_lost(error):
+            return False
+        if handle is not None and handle.cancelled:
+            return False
+        print(f"Connection lost ({error}); reconnecting and retrying.")
+        return True
+
+    def batch_insert(self, insert_query, data_list, batch_size=1000, verbose=True, commit_every=1,
+                     stop_on_error=True, autotune=False):
+        """
+        Perform efficient batch insertion using executemany().
+
+        Rows are pulled from data_list one batch at a time, so it may be any
+        iterable (a generator over a huge file) and memory stays bounded by batch_size.
+
+        Args:
+            insert_query (str): SQL insert statement with placeholders.
+            data_list (iterable of tuples): Data rows to insert.
+            batch_size (int): Number of rows to insert per batch.
+            verbose (bool): Print a summary line when done.
+            commit_every (int): Batches per transaction.
+            stop_on_error (bool): Stop at the first failed batch instead of skipping it.
+            autotune (bool): Start at batch_size and adjust it during the run toward
+                the best observed rows/sec.
+
+        Returns:
+            BatchInsertResult: Rows inserted, failed batch numbers and throughput.
+        """
+        rows = iter(data_list)
+        tuner = BatchSizeTuner(batch_size) if autotune else None
+
+        def batches():
+            while True:
+                batch = list(islice(rows, tuner.batch_size if tuner else batch_size))
+                if not batch:
+                    return
+                yield batch, None
+
+        result = self.insert_batches(insert_query, batches(), commit_every=commit_every,
+                                     stop_on_error=stop_on_error, verbose=verbose,
+                                     on_batch=tuner.record if tuner else None)
+        if tuner and verbose:
+            print(f"Autotuned batch size: {tuner.best_size} ({tuner.best_rate:,.0f} rows/sec).")
+        return result
+
+    def insert_batches(self, insert_query, batches, commit_every=1, on_commit=None, stop_on_error=True,
+                       verbose=True, on_batch=None, first_batch=1):
+        """
+        Insert pre-built batches, committing every commit_every batches.
+
+        Args:
+            insert_query (str): SQL insert statement with placeholders.
+            batches (iterable): (rows, marker) pairs. The marker is opaque to the
+                connector and handed to on_commit, e.g. the input file offset
+                just past the batch, so callers can checkpoint progress.
+            commit_every (int): Batches per transaction.
+            on_commit (callable): Called as on_commit(marker, rows) after each commit,
+                with the marker of the last batch and the rows committed.
+            stop_on_error (bool): Stop at the first failed batch. Otherwise the failed
+                transaction's batches are recorded and the insert carries on.
+            verbose (bool): Print a summary line when done.
+            on_batch (callable): Called as on_batch(rows, seconds) after each successful
+                batch with its write latency (executemany plus any commit it triggered).
+            first_batch (int): Number of the first batch in messages and failed_batches,
+                for callers that split one import across several calls.
+
+        Returns:
+            BatchInsertResult: Rows inserted, failed batch numbers, throughput, time
+            spent in executemany and commit, and a batch latency histogram.
+        """
+        result = BatchInsertResult()
+        if not self.is_connected():
+            print("Database not connected.")
+            return result
+
+        target = insert_query
+        insert_query = self._prepare(insert_query)
+        start = time.perf_counter()
+        try:
+            with self.checkout() as connection:
+                cursor = connection.cursor()
+                pending = []  # (batch number, row count, marker) since the last commit
+
+                def commit():
+                    started = time.perf_counter()
+                    connection.commit()
+                    result.commit_seconds += time.perf_counter() - started
+                    self._invalidate_cache(target)
+                    rows = sum(count for _, count, _ in pending)
+                    result.rows_inserted += rows
+                    result.batches_committed += len(pending)
+                    if on_commit:
+                        on_commit(pending[-1][2], rows)
+                    pending.clear()
+
+                def fail(number, error):
+                    print(f"Batch insert error in batch {number}: {error}")
+                    connection.rollback()
+                    result.failed_batches.extend(n for n, _, _ in pending)
+                    pending.clear()
+
+                try:
+                    for number, (batch, marker) in enumerate(batches, first_batch):
+                        pending.append((number, len(batch), marker))
+                        try:
+                            started = time.perf_counter()
+                            cursor.executemany(insert_query, batch)
+                            result.execute_seconds += time.perf_counter() - started
+                            if len(pending) >= commit_every:
+                                commit()
+                            latency = time.perf_counter() - started
+                            result.latencies.record(latency)
+                            if on_batch:
+                                on_batch(len(batch), latency)
+                        except self.driver_errors as e:
+                            fail(number, e)
+                            if stop_on_error:
+                                break
+                    if pending:
+                        try:
+                            commit()
+                        except self.driver_errors as e:
+                            fail(pending[-1][0], e)
+                finally:
+                    cursor.close()
+        except PoolError as e:
+            print(f"Batch insert error: {e}")
+
+        result.seconds = time.perf_counter() - start
+        if verbose:
+            failed = f", {len(result.failed_batches)} batches failed" if result.failed_batches else ""
+            print(f"Inserted {result.rows_inserted} rows successfully{failed}.")
+        return result
+
+    def fetch_movies(self, columns=None, search_column=None, search_value=None, range_filters=None,
+                     text_query=None, text_fields="all", boolean_mode=False, search_filters=None, handle=None):
+        """
+        Fetch movie records from the database, optionally filtering and selecting columns.
+
+        Args:
+            columns (list): List of columns to retrieve.
+            search_column (str or list): Column to apply filter on. A list matches
+                rows where any of the columns match, in a single query.
+            search_value (str): Value to filter with LIKE.
+            range_filters (dict): Numeric column -> (low, high) inclusive bounds; either
+                bound may be None. Only released_year and imdb_rating are allowed.
+            text_query (str): Free text matched with MATCH ... AGAINST on a FULLTEXT index.
+            text_fields (str): "title" (series_title only) or "all" (title, director, stars).
+            boolean_mode (bool): Use IN BOOLEAN MODE (+word -word "phrase" word*)
+                instead of natural-language mode.
+            search_filters (list): More (search_column, search_value) pairs, each
+                matched like search_column/search_value; every filter must match.
+            handle (QueryHandle): Lets another thread cancel the query.
+
+        Returns:
+            list: Query results or None if error or cancelled.
+        """
+        if not self.is_connected():
+            print("Database not connected.")
+            return None
+
+        sql, params = self._movies_sql(columns, search_column, search_value, range_filters,
+                                       text_query, text_fields, boolean_mode, search_filters=search_filters)
+        return self._fetch_all(sql, params, handle)
+
+    def _fetch_all(self, sql, params, handle=None):
+        if self.cache is not None:
+            key = self.cache.key(sql, params)
+            rows = self.cache.get(key)
+            if rows is not None:
+                return rows
+            generation = self.cache.generation
+        retry = True
+        while True:
+            try:
+                with self.checkout() as connection:
+                    if handle is not None and not handle.attach(connection):
+                        print("Query cancelled.")
+                        return None
+                    try:
+                        rows = self._fetch_rows(connection, self._prepare(sql), params)
+                        if self.cache is not None:
+                            self.cache.put(key, rows, generation)
+                        return rows
+                    finally:
+                        if handle is not None:
+                            handle.detach()
+            except self.db_errors as e:
+                if self._should_retry(e, retry, handle):
+                    retry = False
+                    continue
+                if handle is not None and handle.cancelled:
+                    print("Query cancelled.")
+                else:
+                    print(f"Fetch movies error: {e}")
+                return None
+
+    def iter_movies(self, columns=None, search_column=None, search_value=None, range_filters=None,
+                    text_query=None, text_fields="all", boolean_mode=False, search_filters=None,
+                    batch_size=1000, batches=False, handle=None):
+        """
+        Lazily fetch movie records; same filtering as fetch_movies().
+
+        Args:
+            batch_size (int): Rows pulled from the server per round-trip.
+            batches (bool): Yield lists of up to batch_size rows instead of single rows.
+            handle (QueryHandle): Lets another thread cancel the stream.
+
+        Yields:
+            tuple or list: Rows (or row batches) as they arrive from the server.
+
+        Returns:
+            bool: Whether every row was read, as in stream_query().
+        """
+        sql, params = self._movies_sql(columns, search_column, search_value, range_filters,
+                                       text_query, text_fields, boolean_mode, search_filters=search_filters)
+        return (yield from self.stream_query(sql, params, batch_size=batch_size, batches=batches, handle=handle))
+
+    def count_movies(self, search_column=None, search_value=None, range_filters=None,
+                     text_query=None, text_fields="all", boolean_mode=False, search_filters=None):
+        """
+        Count the movie records fetch_movies() would return for the same filters.
+
+        Returns:
+            int: Matching rows, or None if error.
+        """
+        sql, params = self._movies_sql(["COUNT(*)"], search_column, search_value, range_filters,
+                                       text_query, text_fields, boolean_mode, search_filters=search_filters)
+        rows = self.execute_query(sql, params)
+        return rows[0][0] if rows else None
+
+    def stream_query(self, query, params=None, batch_size=1000, batches=False, handle=None):
+        """
+        Execute a query on an unbuffered cursor and yield results as they arrive,
+        so memory stays bounded by batch_size rather than the result size.
+
+        The connection stays checked out until the generator is exhausted or closed.
+
+        Args:
+            query (str): The SQL query to be executed.
+            params (tuple or list): Optional parameters for the query.
+            batch_size (int): Rows pulled from the server per fetchmany() call.
+            batches (bool): Yield lists of rows instead of single rows.
+            handle (QueryHandle): Lets another thread cancel the stream; it stops
+                at the next batch if the server has not already aborted it.
+
+        A SELECT whose connection is lost before any rows were yielded is retried
+        once; after that a retry would repeat rows, so the stream just ends.
+
+        Returns:
+            bool: The generator's return value (StopIteration.value): True if the
+            whole result set was read, False if the stream stopped early because
+            of an error or cancellation.
+        """
+        if not self.is_connected():
+            print("Database not connected.")
+            return False
+
+        retry = is_read_query(query)
+        while True:
+            try:
+                with self.checkout() as connection:
+                    if handle is not None and not handle.attach(connection):
+                        print("Query cancelled.")
+                        return False
+                    cursor = self._stream_cursor(connection)
+                    finished = False
+                    try:
+                        cursor.execute(self._prepare(query), params or ())
+                        while True:
+                            if handle is not None and handle.cancelled:
+                                print("Query cancelled.")
+                                break
+                            rows = cursor.fetchmany(batch_size)
+                            if not rows:
+                                finished = True
+                                break
+                            retry = False
+                            if batches:
+                                yield rows
+                            else:
+                                yield from rows
+                    finally:
+                        if finished:
+                            cursor.close()
+                        else:
+                            self._abandon_stream(connection, cursor)
+                        if handle is not None:
+                            handle.detach()
+                return finished
+            except self.db_errors as e:
+                if self._should_retry(e, retry, handle):
+                    retry = False
+                    continue
+                if handle is not None and handle.cancelled:
+                    print("Query cancelled.")
+                else:
+                    print(f"Stream query error: {e}")
+                return False
+
+    def fetch_movies_page(self, columns=None, search_column=None, search_value=None, range_filters=None,
+                          text_query=None, text_fields="all", boolean_mode=False, search_filters=None,
+                          page_size=200, page_token=None, handle=None):
+        """
+        Fetch one page of movie records using keyset pagination on id, so each
+        page costs the same no matter how deep into the table it is. Filters are
+        the same as fetch_movies(); full-text matches are returned in id order.
+
+        Args:
+            columns (list): List of columns to retrieve.
+            search_column (str or list): Column to apply filter on. A list matches
+                rows where any of the columns match, in a single query.
+            search_value (str): Value to filter with LIKE.
+            range_filters (dict): Numeric column -> (low, high) inclusive bounds; either
+                bound may be None. Only released_year and imdb_rating are allowed.
+            text_query (str): Free text matched with MATCH ... AGAINST on a FULLTEXT index.
+            text_fields (str): "title" (series_title only) or "all" (title, director, stars).
+            boolean_mode (bool): Use IN BOOLEAN MODE (+word -word "phrase" word*)
+                instead of natural-language mode.
+            search_filters (list): More (search_column, search_value) pairs, each
+                matched like search_column/search_value; every filter must match.
+            page_size (int): Maximum number of rows to return.
+            page_token (str): Token returned by the previous call, or None for the first page.
+            handle (QueryHandle): Lets another thread cancel the query.
+
+        Returns:
+            tuple: (rows, next_page_token). next_page_token is None on the last page;
+            rows is None if an error occurred or the query was cancelled.
+        """
+        if not self.is_connected():
+            print("Database not connected.")
+            return None, None
+
+        try:
+            after_id = self._decode_page_token(page_token)
+        except ValueError as e:
+            print(f"Fetch movies error: {e}")
+            return None, None
+
+        # Fetch one extra row to learn whether another page exists.
+        sql, params = self._movies_sql(columns, search_column, search_value, range_filters,
+                                       text_query, text_fields, boolean_mode, search_filters=search_filters,
+                                       after_id=after_id, limit=page_size + 1)
+        rows = self._fetch_all(sql, params, handle)
+        if rows is None:
+            return None, None
+
+        next_token = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_token = self._encode_page_token(rows[-1][0])
+        return [row[1:] for row in rows], next_token
+
+    @staticmethod
+    def _encode_page_token(last_id):
+        return base64.urlsafe_b64encode(json.dumps({"after_id": last_id}).encode()).decode()
+
+    @staticmethod
+    def _decode_page_token(page_token):
+        if not page_token:
+            return None
+        try:
+            return int(json.loads(base64.urlsafe_b64decode(page_token.encode()))["after_id"])
+        except (ValueError, KeyError, TypeError):
+            raise ValueError(f"Invalid page token: {page_token!r}")
+
+    def _movies_sql(self, columns=None, search_column=None, search_value=None, range_filters=None,
+                    text_query=None, text_fields="all", boolean_mode=False, search_filters=None,
+                    after_id=None, limit=None):
+        """
+        Compile a movie search into one parameterized SELECT. Every criterion is
+        ANDed; selected and searched column names are checked against
+        SELECT_COLUMNS / MOVIE_COLUMNS / RANGE_COLUMNS and all values are bound
+        as parameters.
+        """
+        for col in columns or ():
+            if col not in SELECT_COLUMNS:
+                raise ValueError(f"Cannot select column: {col}")
+        # Qualified: MySQL rejects a bare * after the id that paging puts first.
+        cols = ", ".join(columns) if columns else "movies.*"
+        conditions = []
+        params = []
+
+        searches = list(search_filters or [])
+        if search_column and search_value:
+            searches.insert(0, (search_column, search_value))
+        for column, value in searches:
+            if not value:
+                continue
+            condition, condition_params = self._search_condition(column, value)
+            conditions.append(condition)
+            params.extend(condition_params)
+
+        for column, (low, high) in (range_filters or {}).items():
+            if column not in RANGE_COLUMNS:
+                raise ValueError(f"Range filter not supported on column: {column}")
+            # Plain comparisons on the bare column, so its B-tree index serves a range scan.
+            placeholder = RANGE_COLUMNS[column]
+            if low is not None and high is not None:
+                conditions.append(f"{column} BETWEEN {placeholder} AND {placeholder}")
+                params.extend([low, high])
+            elif low is not None:
+                conditions.append(f"{column} >= {placeholder}")
+                params.append(low)
+            elif high is not None:
+                conditions.append(f"{column} <= {placeholder}")
+                params.append(high)
+
+        if text_query:
+            if text_fields not in FULLTEXT_FIELDS:
+                raise ValueError(f"Unknown full-text fields: {text_fields}")
+            condition, condition_params = self._text_condition(text_query, text_fields, boolean_mode)
+            conditions.append(condition)
+            params.extend(condition_params)
+
+        if limit is not None:
+            # Keyset pagination: the id column leads so callers can seek past it.
+            cols = f"id, {cols}"
+            if after_id is not None:
+                conditions.append("id > %s")
+                params.append(after_id)
+
+        sql = f"SELECT {cols} FROM movies"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        if limit is not None:
+            sql += " ORDER BY id LIMIT %s"
+            params.append(limit)
+
+        return sql, tuple(params)
+
+    def _search_condition(self, search_column, search_value):
+        search_columns = [search_column] if isinstance(search_column, str) else list(search_column)
+        for col in search_columns:
+            if col not in MOVIE_COLUMNS:
+                raise ValueError(f"Search not supported on column: {col}")
+
+        words = name_words(search_value)
+        if self.normalized and words and all(col in NORMALIZED_COLUMNS for col in search_columns):
+            # star1..star3 collapse into one lookup on the 'star' role.
+            lookups = list(dict.fromkeys(NORMALIZED_COLUMNS[col] for col in search_columns))
+            conditions = []
+            for lookup in lookups:
+                movies_sql, key, word_table = NORMALIZED_LOOKUPS[lookup]
+                word_conditions = " AND ".join(
+                    f"{key} IN (SELECT {key} FROM {word_table} WHERE word LIKE %s)" for _ in words
+                )
+                conditions.append(f"id IN ({movies_sql} {word_conditions})")
+            return f"({' OR '.join(conditions)})", [f"{word}%" for word in words] * len(lookups)
+
+        # One OR across the columns: each movie row matches at most once, so no
+        # client-side dedupe or extra round-trips are needed.
+        condition = " OR ".join(f"{col} LIKE %s" for col in search_columns)
+        return f"({condition})", [f"%{search_value}%"] * len(search_columns)
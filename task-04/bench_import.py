@@ -0,0 +1,81 @@
+"""
+Measure import throughput for different numbers of writer connections.
+
+Generates a synthetic movies CSV, then imports it into a scratch database once
+per worker count, truncating movies between runs. Never point this at the real
+moviesdb: the movies table is emptied.
+
+Usage:
+    mysql -e "CREATE DATABASE moviesdb_bench"
+    python3 bench_import.py --rows 200000 --workers 1 2 4 8
+
+    # No server needed: a throwaway SQLite file, reproducible on CI machines.
+    python3 bench_import.py --sqlite /tmp/moviesdb_bench.sqlite3 --workers 1
+"""
+import argparse
+import csv
+import os
+import tempfile
+import time
+
+from connector import MySQLConnector
+from import_csv import import_csv_to_mysql
+from sqlite_connector import SQLiteConnector
+
+
+def write_synthetic_csv(path, count):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["Series_Title", "Released_Year", "Genre", "IMDB_Rating",
+                         "Director", "Star1", "Star2", "Star3"])
+        for i in range(count):
+            writer.writerow([f"Movie {i}", 1950 + i % 70, "Drama, Crime", round(5 + (i % 50) / 10, 1),
+                             f"Director {i % 997}", f"Actor {i % 1009}", f"Actor {i % 1013}", f"Actor {i % 1019}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--database", default="moviesdb_bench")
+    parser.add_argument("--sqlite", metavar="PATH", help="Benchmark against this SQLite file instead of MySQL.")
+    args = parser.parse_args()
+
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    os.close(fd)
+    write_synthetic_csv(path, args.rows)
+    print(f"cpu cores: {os.cpu_count()}, rows: {args.rows}")
+
+    try:
+        results = []
+        for workers in args.workers:
+            if args.sqlite:
+                db = SQLiteConnector(args.sqlite, pool_size=max(workers, 1))
+            else:
+                db = MySQLConnector(database=args.database, pool_size=max(workers, 1))
+            if not db.connect():
+                return
+            db.create_movies_table()
+            with db.checkout() as connection:
+                cursor = connection.cursor()
+                cursor.execute("DELETE FROM movies" if args.sqlite else "TRUNCATE TABLE movies")
+                connection.commit()
+                cursor.close()
+
+            start = time.perf_counter()
+            imported = import_csv_to_mysql(path, db=db, workers=workers)
+            elapsed = time.perf_counter() - start
+            db.disconnect()
+            results.append((workers, imported, elapsed))
+
+        base = results[0][1] / results[0][2] if results and results[0][2] else 0
+        print(f"\n{'workers':>8} {'rows/sec':>12} {'speedup':>8}")
+        for workers, imported, elapsed in results:
+            rate = imported / elapsed if elapsed else 0
+            print(f"{workers:>8} {rate:>12,.0f} {rate / base if base else 0:>7.2f}x")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Measure per-query overhead of the dashboard's searches with and without the
+prepared-statement cache.
+
+Each search shape (genre, director, year range, rating range) runs --repeat
+times with varying values, fetching one small page, so the timings are
+dominated by parsing, planning and round-trip costs rather than row transfer.
+The result cache is left off. Run against a database that already holds movies.
+
+Usage:
+    python3 bench_query.py --repeat 2000
+    python3 bench_query.py --sqlite moviesdb.sqlite3 --sizes 0 128
+"""
+import argparse
+import time
+
+from base_connector import MOVIE_COLUMNS
+from connector import MySQLConnector
+from sqlite_connector import SQLiteConnector
+
+GENRES = ["Drama", "Crime", "Action", "Comedy", "Horror", "Romance", "Thriller"]
+
+# Search shape -> fetch_movies_page() arguments for the i-th run.
+SEARCHES = {
+    "genre": lambda i: {"search_column": "genre", "search_value": GENRES[i % len(GENRES)]},
+    "director": lambda i: {"search_column": "director", "search_value": f"Director {i % 997}"},
+    "year range": lambda i: {"range_filters": {"released_year": (1950 + i % 60, 1960 + i % 60)}},
+    "rating range": lambda i: {"range_filters": {"imdb_rating": (5 + (i % 40) / 10, None)}},
+}
+
+
+def fetch_page(db, name, arguments, page_size):
+    """One page of a search with the dashboard's columns; a failed query aborts the run."""
+    rows, _ = db.fetch_movies_page(MOVIE_COLUMNS, **arguments, page_size=page_size)
+    if rows is None:
+        raise SystemExit(f"The {name} search failed; timings would only measure the error path.")
+
+
+def time_searches(db, repeat, page_size):
+    """Median and 95th percentile microseconds per call for each search shape."""
+    results = {}
+    for name, arguments in SEARCHES.items():
+        for i in range(min(repeat, 50)):   # warm-up: connections, caches, buffer pool
+            fetch_page(db, name, arguments(i), page_size)
+        samples = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            fetch_page(db, name, arguments(i), page_size)
+            samples.append(time.perf_counter() - start)
+        samples.sort()
+        results[name] = (samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.95)] * 1e6)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 64],
+                        help="Statement cache sizes to compare (0 = no prepared statements).")
+    parser.add_argument("--database", default="moviesdb")
+    parser.add_argument("--sqlite", metavar="PATH", help="Benchmark against this SQLite file instead of MySQL.")
+    args = parser.parse_args()
+
+    runs = []
+    for size in args.sizes:
+        if args.sqlite:
+            db = SQLiteConnector(args.sqlite, pool_size=1, statement_cache_size=size)
+        else:
+            db = MySQLConnector(database=args.database, pool_size=1, statement_cache_size=size)
+        if not db.connect():
+            return
+        db.normalized = db.has_normalized_schema()
+        runs.append((size, time_searches(db, args.repeat, args.page_size)))
+        db.disconnect()
+
+    base = runs[0][1]
+    print(f"\n{'search':<14} {'cache':>6} {'p50 us':>9} {'p95 us':>9} {'vs first':>9}")
+    for name in SEARCHES:
+        for size, results in runs:
+            p50, p95 = results[name]
+            print(f"{name:<14} {size:>6} {p50:>9.0f} {p95:>9.0f} {base[name][0] / p50:>8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Compare table render cost of QTableWidget (one QTableWidgetItem per cell)
+against MovieTableModel + QTableView (cells formatted on demand).
+
+Usage:
+    QT_QPA_PLATFORM=offscreen python3 bench_render.py [--rows 10000 100000 1000000]
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtWidgets import QApplication, QTableView, QTableWidget, QTableWidgetItem
+
+from movie_table_model import MovieTableModel
+
+COLUMNS = ["series_title", "released_year", "genre", "imdb_rating", "director", "star1", "star2", "star3"]
+
+
+def make_rows(count):
+    return [
+        (f"Movie {i}", 1950 + i % 70, "Drama, Crime", round(5 + (i % 50) / 10, 1),
+         f"Director {i % 997}", f"Actor {i % 1009}", f"Actor {i % 1013}", f"Actor {i % 1019}")
+        for i in range(count)
+    ]
+
+
+def bench_widget(app, rows):
+    start = time.perf_counter()
+    table = QTableWidget()
+    table.setRowCount(len(rows))
+    table.setColumnCount(len(COLUMNS))
+    table.setHorizontalHeaderLabels(COLUMNS)
+    for row_idx, row_data in enumerate(rows):
+        for col_idx, cell in enumerate(row_data):
+            table.setItem(row_idx, col_idx, QTableWidgetItem(str(cell)))
+    table.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    table.close()
+    return elapsed
+
+
+def bench_model(app, rows):
+    start = time.perf_counter()
+    model = MovieTableModel()
+    view = QTableView()
+    view.setModel(model)
+    model.set_results(rows, COLUMNS)
+    view.show()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    view.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--widget-limit", type=int, default=100_000,
+                        help="Skip the QTableWidget run above this many rows (it needs GBs of RAM).")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    print(f"{'rows':>10} {'QTableWidget':>14} {'MovieTableModel':>16}")
+    for count in args.rows:
+        rows = make_rows(count)
+        widget = f"{bench_widget(app, rows):.3f}s" if count <= args.widget_limit else "skipped"
+        model = f"{bench_model(app, rows):.3f}s"
+        print(f"{count:>10} {widget:>14} {model:>16}")
+
+
+if __name__ == "__main__":
+    main()
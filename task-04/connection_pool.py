@@ -0,0 +1,202 @@
+import threading
+import time
+from collections import deque
+
+
+class PoolError(Exception):
+    """Raised when a connection cannot be checked out of the pool."""
+
+
+class ConnectionPool:
+    def __init__(self, factory, max_size=5, max_lifetime=3600, health_check_interval=30, checkout_timeout=10,
+                 is_alive=None):
+        """
+        Bounded pool of database connections with checkout/checkin.
+
+        Args:
+            factory (callable): Opens and returns a new connection.
+            max_size (int): Maximum number of open connections.
+            max_lifetime (float): Seconds after which a connection is closed and replaced.
+            health_check_interval (float): Idle seconds after which a connection is pinged before reuse.
+            checkout_timeout (float): Seconds to wait for a free connection before giving up.
+            is_alive (callable): Health check taking a connection; defaults to
+                connection.is_connected().
+        """
+        self.factory = factory
+        self.is_alive = is_alive or (lambda connection: connection.is_connected())
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+
+        self._idle = deque()      # (connection, created_at, last_used)
+        self._created = {}        # id(connection) -> created_at
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+        self._recycled = 0
+        self._health_failures = 0
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def checkout(self, timeout=None):
+        """
+        Take a connection out of the pool, opening a new one if the pool is not full.
+
+        Args:
+            timeout (float): Seconds to wait for a free connection (defaults to checkout_timeout).
+
+        Returns:
+            A live connection. Must be returned with checkin().
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise PoolError("Connection pool is closed.")
+                if self._idle:
+                    connection, created_at, last_used = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    connection = None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._timeouts += 1
+                    raise PoolError(f"Timed out after {timeout}s waiting for a free connection.")
+                waited = True
+                self._cond.wait(remaining)
+
+            wait = time.monotonic() - start
+            self._checkouts += 1
+            if waited:
+                self._waits += 1
+            self._wait_total += wait
+            self._wait_max = max(self._wait_max, wait)
+
+        if connection is not None and not self._is_usable(connection, created_at, last_used):
+            self._close(connection)
+            connection = None
+
+        if connection is None:
+            try:
+                connection = self.factory()
+            except Exception:
+                self._release_slot()
+                raise
+            with self._cond:
+                self._created[id(connection)] = time.monotonic()
+
+        return connection
+
+    def checkin(self, connection, discard=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            connection: Connection previously obtained from checkout().
+            discard (bool): Close the connection instead of keeping it for reuse.
+        """
+        with self._cond:
+            created_at = self._created.get(id(connection), 0)
+        expired = time.monotonic() - created_at > self.max_lifetime
+
+        if not discard and not expired:
+            try:
+                # End any open read snapshot so the next user sees fresh data.
+                if getattr(connection, "in_transaction", False):
+                    connection.rollback()
+            except Exception:
+                discard = True
+
+        if discard or expired or self._closed:
+            if expired:
+                with self._cond:
+                    self._recycled += 1
+            self._close(connection)
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append((connection, created_at, time.monotonic()))
+            self._cond.notify()
+
+    def recheck_idle(self):
+        """
+        Make the next checkout of each idle connection ping it first, as if it had
+        been idle past health_check_interval; e.g. after one was found dead.
+        """
+        with self._cond:
+            self._idle = deque((connection, created_at, 0.0) for connection, created_at, _ in self._idle)
+
+    def close(self):
+        """Close every idle connection and refuse further checkouts."""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for connection, _, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        """Return a snapshot of pool usage and wait metrics."""
+        with self._cond:
+            idle = len(self._idle)
+            return {
+                "size": self._size,
+                "idle": idle,
+                "in_use": self._size - idle,
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": (self._wait_total / self._checkouts * 1000) if self._checkouts else 0.0,
+                "max_wait_ms": self._wait_max * 1000,
+                "timeouts": self._timeouts,
+                "recycled": self._recycled,
+                "health_failures": self._health_failures,
+            }
+
+    def _is_usable(self, connection, created_at, last_used):
+        # Called without the lock held (the ping may be slow); counters take it.
+        now = time.monotonic()
+        if now - created_at > self.max_lifetime:
+            with self._cond:
+                self._recycled += 1
+            return False
+        if now - last_used > self.health_check_interval:
+            try:
+                alive = self.is_alive(connection)
+            except Exception:
+                alive = False
+            if not alive:
+                with self._cond:
+                    self._health_failures += 1
+                return False
+        return True
+
+    def _close(self, connection):
+        with self._cond:
+            self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
@@ -1,124 +1,354 @@
+import struct
+from collections import OrderedDict
+
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, FieldType, errorcode
+
+from base_connector import FULLTEXT_FIELDS, BaseConnector, is_read_query
+
+# Secondary indexes on movies: name -> (index kind, indexed columns).
+MOVIE_INDEXES = {
+    "idx_movies_year": ("INDEX", "released_year"),
+    "idx_movies_rating": ("INDEX", "imdb_rating"),
+    "idx_movies_updated": ("INDEX", "updated_at"),
+    "ft_movies_title": ("FULLTEXT INDEX", "series_title"),
+    "ft_movies_text": ("FULLTEXT INDEX", "series_title, director, star1, star2, star3"),
+}
+
+def _single_precision(value):
+    """
+    Shortest decimal that reads back as the same FLOAT. The binary protocol of
+    prepared statements sends FLOAT columns as raw single-precision values
+    (8.100000381469727); the text protocol sends this form (8.1).
+    """
+    for digits in range(6, 10):
+        candidate = float(f"{value:.{digits}g}")
+        if struct.unpack("f", struct.pack("f", candidate))[0] == value:
+            return candidate
+    return value
+
+# Errors meaning the connection itself is gone: server shutdown (1053), can't
+# connect (2003), server has gone away (2006), lost during a query (2013, 2055)
+# and idle connection closed by the server (4031). A statement stopped by
+# KILL QUERY (1317) is an OperationalError too but leaves the connection usable.
+CONNECTION_LOST_ERRNOS = {1053, 2003, 2006, 2013, 2055, 4031}
+
+class MySQLConnector(BaseConnector):
+    display_name = "MySQL database"
+    driver_errors = (Error,)
+    connection_lost_errors = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError)
+    supports_load_data = True
 
-class MySQLConnector:
-    def __init__(self, host='localhost', user='root', password='Ajul@2007', database='moviesdb'):
+    # Incremental mode: insert with the content hash, updating rows whose
+    # (series_title, year_key) key already exists.
+    upsert_sql = """
+        INSERT INTO movies (series_title, released_year, genre, imdb_rating, director, star1, star2, star3, row_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE
+            genre = VALUES(genre),
+            imdb_rating = VALUES(imdb_rating),
+            director = VALUES(director),
+            star1 = VALUES(star1),
+            star2 = VALUES(star2),
+            star3 = VALUES(star3),
+            row_hash = VALUES(row_hash)
+    """
+
+    def __init__(self, host='localhost', user='root', password='Ajul@2007', database='moviesdb',
+                 pool_size=None, pool_max_lifetime=3600, pool_timeout=10, normalized=False,
+                 allow_local_infile=False, cache_size=None, cache_ttl=60, statement_cache_size=None):
+        """
+        Args:
+            pool_size (int): If set, use a bounded connection pool of this size
+                instead of a single shared connection.
+            pool_max_lifetime (float): Seconds before a pooled connection is recycled.
+            pool_timeout (float): Seconds to wait for a free pooled connection.
+            normalized (bool): Answer genre/director/star searches from the normalized
+                genres/people join tables instead of LIKE scans over the movies table.
+            allow_local_infile (bool): Let this client send files for LOAD DATA LOCAL INFILE.
+            cache_size (int): If set, cache up to this many fetch_movies() results
+                (LRU; invalidated by batch_insert() into the movie tables).
+            cache_ttl (float): Seconds a cached result is reused.
+            statement_cache_size (int): If set, run SELECTs from execute_query() and
+                fetch_movies() as server-side prepared statements, keeping up to this
+                many per connection so repeated query shapes skip parsing and planning.
+        """
+        super().__init__(pool_size=pool_size, pool_max_lifetime=pool_max_lifetime,
+                         pool_timeout=pool_timeout, normalized=normalized,
+                         cache_size=cache_size, cache_ttl=cache_ttl,
+                         statement_cache_size=statement_cache_size)
         self.host = host
         self.user = user
         self.password = password
         self.database = database
-        self.connection = None
+        self.allow_local_infile = allow_local_infile
+
+    def _open_connection(self):
+        return mysql.connector.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            allow_local_infile=self.allow_local_infile
+        )
+
+    def _connection_alive(self, connection):
+        return connection.is_connected()
+
+    def _is_connection_lost(self, error):
+        # The driver raises OperationalError for KILL QUERY as well, so go by the
+        # error number. Client-side errors carry none ("MySQL Connection not
+        # available") and only occur once the connection is already gone.
+        return isinstance(error, self.connection_lost_errors) and (
+            error.errno in CONNECTION_LOST_ERRNOS or error.errno in (None, -1)
+        )
+
+    def _stream_cursor(self, connection):
+        return connection.cursor(buffered=False)
+
+    def _abandon_stream(self, connection, cursor):
+        if self.pool is None:
+            # The shared connection must be drained before it can be reused.
+            connection.consume_results()
+            cursor.close()
+        # A pooled connection is discarded on checkin instead (see checkout()).
+
+    def _has_unread_result(self, connection):
+        return getattr(connection, "unread_result", False)
+
+    def _fetch_rows(self, connection, sql, params):
+        if not self.statement_cache_size or not is_read_query(sql):
+            return super()._fetch_rows(connection, sql, params)
+
+        # sql -> (prepared cursor, the string it prepared, float column positions),
+        # least recently used first. Kept on the connection so it goes away when
+        # the pool drops the connection.
+        statements = getattr(connection, "_prepared_statements", None)
+        if statements is None:
+            statements = connection._prepared_statements = OrderedDict()
+        entry = statements.pop(sql, None)
+        if entry is None:
+            cursor, floats = connection.cursor(prepared=True), None
+        else:
+            # The cursor re-prepares unless given the very string object it prepared.
+            cursor, sql, floats = entry
+        try:
+            cursor.execute(sql, params or ())
+            rows = cursor.fetchall()
+        except Error:
+            cursor.close()
+            raise
+        if floats is None:
+            floats = [i for i, column in enumerate(cursor.description) if column[1] == FieldType.FLOAT]
+        statements[sql] = (cursor, sql, floats)
+        while len(statements) > self.statement_cache_size:
+            _, (evicted, _, _) = statements.popitem(last=False)
+            evicted.close()
+
+        if floats:
+            rows = [tuple(_single_precision(value) if i in floats and value is not None else value
+                          for i, value in enumerate(row)) for row in rows]
+        return rows
+
+    def _count_tables_sql(self, names):
+        quoted = ", ".join(f"'{name}'" for name in names)
+        return ("SELECT COUNT(*) FROM information_schema.tables "
+                f"WHERE table_schema = DATABASE() AND table_name IN ({quoted})")
 
-    def connect(self):
-        """Establish connection to the MySQL database."""
+    def _count_columns_sql(self, table, names):
+        quoted = ", ".join(f"'{name}'" for name in names)
+        return ("SELECT COUNT(*) FROM information_schema.columns "
+                f"WHERE table_schema = DATABASE() AND table_name = '{table}' AND column_name IN ({quoted})")
+
+    def _interrupt(self, connection):
+        # KILL QUERY has to come from another session; a short-lived one avoids
+        # waiting on the pool, which may be exhausted by the very queries being killed.
+        killer = self._open_connection()
         try:
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.database
+            cursor = killer.cursor()
+            cursor.execute("KILL QUERY %s", (connection.connection_id,))
+            cursor.close()
+        finally:
+            killer.close()
+
+    def _movies_modified(self):
+        rows = self.execute_query(
+            "SELECT UPDATE_TIME FROM information_schema.tables "
+            "WHERE table_schema = DATABASE() AND table_name = 'movies'"
+        )
+        return rows[0][0] if rows else None
+
+    def _text_condition(self, text_query, text_fields, boolean_mode):
+        mode = "IN BOOLEAN MODE" if boolean_mode else "IN NATURAL LANGUAGE MODE"
+        return f"MATCH({FULLTEXT_FIELDS[text_fields]}) AGAINST (%s {mode})", [text_query]
+
+    def _create_staging_tables(self, cursor):
+        cursor.execute("""
+            CREATE TEMPORARY TABLE staging_genres (
+                movie_id INT NOT NULL,
+                name VARCHAR(100) NOT NULL
             )
-            if self.connection.is_connected():
-                print("Connected to MySQL database")
-                return True
-            else:
-                return False
-        except Error as e:
-            print(f"Error connecting to MySQL database: {e}")
-            return False
-
-    def disconnect(self):
-        """Close the database connection."""
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-
-    def is_connected(self):
-        """Check if the database connection is active."""
-        return self.connection is not None and self.connection.is_connected()
-
-    def execute_query(self, query, params=None):
+        """)
+        cursor.execute("""
+            CREATE TEMPORARY TABLE staging_people (
+                movie_id INT NOT NULL,
+                name VARCHAR(255) NOT NULL,
+                role ENUM('director', 'star') NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TEMPORARY TABLE staging_genre_words (
+                name VARCHAR(100) NOT NULL,
+                word VARCHAR(100) NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TEMPORARY TABLE staging_person_words (
+                name VARCHAR(255) NOT NULL,
+                word VARCHAR(100) NOT NULL
+            )
+        """)
+
+    def _drop_staging_tables(self, cursor):
+        cursor.execute("DROP TEMPORARY TABLE IF EXISTS staging_genres, staging_people, "
+                       "staging_genre_words, staging_person_words")
+
+    def create_movies_table(self):
         """
-        Execute a SQL query with optional parameters.
-        
-        Args:
-            query (str): The SQL query to be executed.
-            params (tuple or list): Optional parameters for the query.
-        
-        Returns:
-            list: Fetched results as list of tuples or None if error occurs.
+        Create movies, its updated_at change-tracking column and its secondary
+        indexes, skipping any that already exist.
         """
-        if not self.is_connected():
-            print("Database not connected.")
-            return None
-        
-        cursor = self.connection.cursor()
-        try:
-            cursor.execute(query, params or ())
-            results = cursor.fetchall()
-            return results
-        except Error as e:
-            print(f"Query execution error: {e}")
-            return None
-        finally:
-            cursor.close()
+        with self.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS movies (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        series_title VARCHAR(255),
+                        released_year INT,
+                        genre VARCHAR(255),
+                        imdb_rating FLOAT,
+                        director VARCHAR(255),
+                        star1 VARCHAR(255),
+                        star2 VARCHAR(255),
+                        star3 VARCHAR(255),
+                        updated_at TIMESTAMP(6) NOT NULL
+                            DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+                    )
+                """)
+                try:
+                    # Tables from before change tracking; existing rows get the current time.
+                    cursor.execute("ALTER TABLE movies ADD COLUMN updated_at TIMESTAMP(6) NOT NULL "
+                                   "DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)")
+                except Error as e:
+                    if e.errno != errorcode.ER_DUP_FIELDNAME:
+                        raise
+                for name, (kind, columns) in MOVIE_INDEXES.items():
+                    try:
+                        cursor.execute(f"CREATE {kind} {name} ON movies ({columns})")
+                    except Error as e:
+                        if e.errno != errorcode.ER_DUP_KEYNAME:
+                            raise
+            finally:
+                cursor.close()
 
-    def batch_insert(self, insert_query, data_list, batch_size=1000):
+    def ensure_incremental_schema(self):
         """
-        Perform efficient batch insertion using executemany().
-        
-        Args:
-            insert_query (str): SQL insert statement with placeholders.
-            data_list (list of tuples): Data rows to insert.
-            batch_size (int): Number of rows to insert per batch.
+        Add the row_hash column and the (series_title, released_year) unique key
+        needed for incremental imports. Existing pieces are left alone.
         """
-        if not self.is_connected():
-            print("Database not connected.")
-            return
-        
-        cursor = self.connection.cursor()
-        try:
-            for i in range(0, len(data_list), batch_size):
-                batch = data_list[i:i+batch_size]
-                cursor.executemany(insert_query, batch)
-                self.connection.commit()
-            print(f"Inserted {len(data_list)} rows successfully.")
-        except Error as e:
-            print(f"Batch insert error: {e}")
-            self.connection.rollback()
-        finally:
-            cursor.close()
+        with self.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                try:
+                    cursor.execute("ALTER TABLE movies ADD COLUMN row_hash CHAR(40) NULL")
+                except Error as e:
+                    if e.errno != errorcode.ER_DUP_FIELDNAME:
+                        raise
+                try:
+                    # NULLs never collide in a unique key, so rows without a year
+                    # would be inserted again on every run; key them as year 0.
+                    cursor.execute("ALTER TABLE movies ADD COLUMN year_key INT "
+                                   "AS (COALESCE(released_year, 0)) STORED")
+                except Error as e:
+                    if e.errno != errorcode.ER_DUP_FIELDNAME:
+                        raise
+                try:
+                    cursor.execute("ALTER TABLE movies ADD UNIQUE KEY uq_movies_title_year_key (series_title, year_key)")
+                except Error as e:
+                    if e.errno == errorcode.ER_DUP_ENTRY:
+                        print("movies already contains duplicate (title, year) rows; "
+                              "remove them before an incremental import.")
+                        raise
+                    if e.errno != errorcode.ER_DUP_KEYNAME:
+                        raise
+                try:
+                    # The older (series_title, released_year) key, superseded by the one above.
+                    cursor.execute("ALTER TABLE movies DROP INDEX uq_movies_title_year")
+                except Error as e:
+                    if e.errno != errorcode.ER_CANT_DROP_FIELD_OR_KEY:
+                        raise
+            finally:
+                cursor.close()
 
-    def fetch_movies(self, columns=None, search_column=None, search_value=None):
+    def create_normalized_tables(self):
         """
-        Fetch movie records from the database, optionally filtering and selecting columns.
-        
-        Args:
-            columns (list): List of columns to retrieve.
-            search_column (str): Column to apply filter on.
-            search_value (str): Value to filter with LIKE.
-        
-        Returns:
-            list: Query results or None if error.
+        Create the genre/people lookup tables, the word tables that index their
+        names word by word, and the join tables.
         """
-        if not self.is_connected():
-            print("Database not connected.")
-            return None
-        
-        cursor = self.connection.cursor()
-        try:
-            cols = ", ".join(columns) if columns else "*"
-            sql = f"SELECT {cols} FROM movies"
-            params = ()
-            
-            if search_column and search_value:
-                sql += f" WHERE {search_column} LIKE %s"
-                params = (f"%{search_value}%",)
-            
-            cursor.execute(sql, params)
-            results = cursor.fetchall()
-            return results
-        except Error as e:
-            print(f"Fetch movies error: {e}")
-            return None
-        finally:
-            cursor.close()
+        with self.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS genres (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        name VARCHAR(100) NOT NULL,
+                        UNIQUE KEY uq_genres_name (name)
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS people (
+                        id INT AUTO_INCREMENT PRIMARY KEY,
+                        name VARCHAR(255) NOT NULL,
+                        UNIQUE KEY uq_people_name (name)
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS movie_genres (
+                        movie_id INT NOT NULL,
+                        genre_id INT NOT NULL,
+                        PRIMARY KEY (genre_id, movie_id),
+                        KEY idx_movie_genres_movie (movie_id),
+                        FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE,
+                        FOREIGN KEY (genre_id) REFERENCES genres (id) ON DELETE CASCADE
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS movie_people (
+                        movie_id INT NOT NULL,
+                        person_id INT NOT NULL,
+                        role ENUM('director', 'star') NOT NULL,
+                        PRIMARY KEY (person_id, role, movie_id),
+                        KEY idx_movie_people_movie (movie_id),
+                        FOREIGN KEY (movie_id) REFERENCES movies (id) ON DELETE CASCADE,
+                        FOREIGN KEY (person_id) REFERENCES people (id) ON DELETE CASCADE
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS genre_words (
+                        word VARCHAR(100) NOT NULL,
+                        genre_id INT NOT NULL,
+                        PRIMARY KEY (word, genre_id),
+                        FOREIGN KEY (genre_id) REFERENCES genres (id) ON DELETE CASCADE
+                    )
+                """)
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS person_words (
+                        word VARCHAR(100) NOT NULL,
+                        person_id INT NOT NULL,
+                        PRIMARY KEY (word, person_id),
+                        FOREIGN KEY (person_id) REFERENCES people (id) ON DELETE CASCADE
+                    )
+                """)
+            finally:
+                cursor.close()
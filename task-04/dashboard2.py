@@ -1,30 +1,156 @@
+import os
 import sys
-import csv
+import time
+import argparse
 from PySide6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QTableWidget, QTableWidgetItem, QGridLayout,
-    QTextEdit, QSizePolicy, QLineEdit, QFileDialog
+    QPushButton, QTableView, QGridLayout,
+    QTextEdit, QSizePolicy, QLineEdit, QFileDialog, QProgressBar
 )
 from PySide6.QtGui import QFont
-from PySide6.QtCore import Qt
+from PySide6.QtCore import Qt, QTimer, Signal
+from base_connector import MOVIE_COLUMNS, movie_search
 from connector import MySQLConnector
+from exporter import export_movies, write_rows
+from sqlite_connector import SQLiteConnector
+from movie_store import MovieStore
+from movie_table_model import MovieFilterProxy, MovieTableModel
+from query_runner import QueryRunner
+from token_index import INDEXED_FIELDS, TokenIndex
+
+PAGE_SIZE = 200
+LIVE_SEARCH_DELAY_MS = 150
+QUERY_TIMEOUT = 30
+EXPORT_CHUNK_SIZE = 5000
+
+def parse_range(term, cast):
+    """
+    Parse a numeric search term into inclusive (low, high) bounds.
+
+    "1995" -> (1995, 1995), "1990-2000" -> (1990, 2000), "2000+" -> (2000, None),
+    "-2000" -> (None, 2000).
+    Raises ValueError for anything else.
+    """
+    term = term.replace(" ", "")
+    if term.endswith("+"):
+        return cast(term[:-1]), None
+    if "-" in term:
+        low, high = term.split("-", 1)
+        return (cast(low) if low else None), (cast(high) if high else None)
+    value = cast(term)
+    return value, value
 
 class Dashboard2(QWidget):
-    def __init__(self):
+    # (rows written, total rows or None), emitted from the export worker thread.
+    export_progress = Signal(int, object)
+
+    def __init__(self, db=None, memory_store=False, live_search=True, snapshot=None):
+        """
+        Args:
+            memory_store (bool): Answer searches from an in-memory columnar copy of movies.
+            live_search (bool): Build the search-as-you-type index at startup.
+            snapshot (str): Snapshot file for the in-memory store (implies memory_store):
+                mapped at startup instead of reading the whole table, then synced
+                with the database in the background and rewritten.
+        """
         super().__init__()
-        self.db = MySQLConnector()
+        self.db = db or MySQLConnector(pool_size=4)
         if not self.db.connect():
             raise Exception("Failed to connect to database")
+        self.db.normalized = self.db.has_normalized_schema()
+        self.store = MovieStore(self.db) if memory_store or snapshot else None
+        self.snapshot = snapshot
+        self.sync_ticket = None
+        self.live_search = live_search
+        self.token_index = None   # built on a worker by start_index_build()
 
         self.search_mode = None
+        self.filters = {}   # Search By mode -> term, combined into one query
+        self.current_query = None
+        self.next_page_token = None
+        self.store_results = False   # pages of the shown results come from the store
+        self.search_ticket = None
+        self.search_label = None
+        self.search_started = 0.0
+        self.page_ticket = None
+        self.export_ticket = None
+        self.export_path = None
         self.selected_columns = set(["title", "year", "genre", "rating", "director", "stars"])
 
         self.setWindowTitle("CineScope – Dashboard")
         self.setMinimumSize(1200, 800)
         self.setStyleSheet("background-color: #121212; color: white; padding: 20px;")
         self.init_ui()
+
+        # Database queries run on worker threads; results come back through signals.
+        self.runner = QueryRunner(self.db, timeout=QUERY_TIMEOUT, parent=self)
+        self.runner.finished.connect(self.on_query_finished)
+        self.runner.failed.connect(self.on_query_failed)
+        self.runner.cancelled.connect(self.on_query_cancelled)
+        # Exports get their own runner: no timeout, and they don't hold up searches.
+        self.export_runner = QueryRunner(self.db, timeout=None, parent=self)
+        self.export_runner.finished.connect(self.on_export_finished)
+        self.export_runner.failed.connect(self.on_export_failed)
+        self.export_runner.cancelled.connect(self.on_export_cancelled)
+        self.export_progress.connect(self.on_export_progress)
+        self.sync_runner = QueryRunner(self.db, timeout=None, parent=self)
+        self.sync_runner.finished.connect(self.on_sync_finished)
+        self.sync_runner.failed.connect(self.on_sync_failed)
+        self.index_runner = QueryRunner(self.db, timeout=None, parent=self)
+        self.index_runner.finished.connect(self.on_index_finished)
+        self.index_runner.failed.connect(self.on_index_failed)
+
+        if self.db.normalized:
+            self.output_console.append("Using normalized genre/people tables for genre, director and actor searches.")
+        if self.store is not None:
+            if self.snapshot and self.store.open_snapshot(self.snapshot):
+                self.output_console.append(
+                    f"Mapped {len(self.store)} movies from {self.snapshot} in {self.store.load_seconds * 1000:.0f} ms; "
+                    "syncing with the database in the background."
+                )
+            else:
+                # A full load reads the whole table: keep it off the GUI thread and
+                # answer from the database until on_sync_finished() reports it done.
+                self.output_console.append(
+                    "Loading the in-memory store in the background; searches use the database until it is ready."
+                )
+            self.start_store_sync()
+        # Without a mapped snapshot the store sync builds the index once loaded.
+        if self.live_search and (self.store is None or self.store.loaded):
+            self.start_index_build()
         self.load_movies_data()
 
+    def start_index_build(self):
+        """
+        Build the search-as-you-type index on a worker thread. Live search stays
+        off until on_index_finished() installs it.
+        """
+        # Index from the store when there is one: no second full read of the table.
+        source = self.store if self.store is not None and self.store.loaded else self.db
+
+        def build(handle):
+            index = TokenIndex()
+            return index if index.build(source) else None
+
+        self.index_runner.submit(build)
+
+    def on_index_finished(self, ticket, index):
+        if index is None:
+            self.output_console.append("Building the search-as-you-type index failed; see the terminal for details.")
+            return
+        # A store sync that finished first has already installed a newer index.
+        if self.token_index is None:
+            self.token_index = index
+        self.output_console.append(
+            f"Indexed {len(index)} movies for search-as-you-type in {index.build_seconds * 1000:.0f} ms."
+        )
+        # Catch up with whatever was typed while the index was building.
+        if self.query_input.text().strip():
+            self.schedule_live_search()
+
+    def on_index_failed(self, ticket, message):
+        self.output_console.append(f"Building the search-as-you-type index failed: {message}")
+
     def init_ui(self):
         main_layout = QVBoxLayout()
         main_layout.setContentsMargins(20, 20, 20, 20)
@@ -50,6 +176,8 @@ class Dashboard2(QWidget):
         left_container.addWidget(search_heading)
 
         search_buttons = [
+            ("Title", "title"),
+            ("Keyword", "keyword"),
             ("Genre", "genre"),
             ("Year", "year"),
             ("Rating", "rating"),
@@ -99,6 +227,13 @@ class Dashboard2(QWidget):
         self.query_input.setStyleSheet("background-color: #1e1e1e; color: white; padding: 5px; border: 1px solid #444;")
         left_container.addWidget(self.query_input)
 
+        # Title/director/actor searches run as you type, once typing pauses.
+        self.live_search_timer = QTimer(self)
+        self.live_search_timer.setSingleShot(True)
+        self.live_search_timer.setInterval(LIVE_SEARCH_DELAY_MS)
+        self.live_search_timer.timeout.connect(self.run_live_search)
+        self.query_input.textEdited.connect(self.schedule_live_search)
+
         # Action Buttons
         action_layout = QHBoxLayout()
         search_btn = QPushButton("Search")
@@ -106,21 +241,62 @@ class Dashboard2(QWidget):
         search_btn.clicked.connect(self.execute_search)
         action_layout.addWidget(search_btn)
 
-        export_btn = QPushButton("Export CSV")
-        export_btn.setStyleSheet("background-color: #1f1f1f; color: white; padding: 6px; border-radius: 5px;")
-        export_btn.clicked.connect(self.export_csv)
-        action_layout.addWidget(export_btn)
+        self.export_btn = QPushButton("Export")
+        self.export_btn.setStyleSheet("background-color: #1f1f1f; color: white; padding: 6px; border-radius: 5px;")
+        self.export_btn.clicked.connect(self.export_results)
+        action_layout.addWidget(self.export_btn)
 
         left_container.addLayout(action_layout)
 
+        self.export_bar = QProgressBar()
+        self.export_bar.setFormat("Exported %v / %m")
+        self.export_bar.hide()
+        left_container.addWidget(self.export_bar)
+
+        # Stacked Filters Section
+        filter_heading = QLabel("Stacked Filters")
+        filter_heading.setFont(QFont("Arial", 18, QFont.Bold))
+        left_container.addWidget(filter_heading)
+
+        self.filter_stack = QVBoxLayout()
+        left_container.addLayout(self.filter_stack)
+
+        filter_actions = QHBoxLayout()
+        add_filter_btn = QPushButton("Add Filter")
+        add_filter_btn.setStyleSheet("background-color: #1f1f1f; color: white; padding: 6px; border-radius: 5px;")
+        add_filter_btn.setToolTip("Add the Search By mode and term as a filter; all filters run as one query")
+        add_filter_btn.clicked.connect(self.add_filter)
+        filter_actions.addWidget(add_filter_btn)
+
+        clear_filters_btn = QPushButton("Clear Filters")
+        clear_filters_btn.setStyleSheet("background-color: #1f1f1f; color: white; padding: 6px; border-radius: 5px;")
+        clear_filters_btn.clicked.connect(self.clear_filters)
+        filter_actions.addWidget(clear_filters_btn)
+        left_container.addLayout(filter_actions)
+
         # Right Panel
         right_side_layout = QVBoxLayout()
         right_side_layout.setSpacing(10)
 
-        # Table Widget
-        self.table = QTableWidget()
+        # Local filter over the fetched rows
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter shown results")
+        self.filter_input.setStyleSheet("background-color: #1e1e1e; color: white; padding: 5px; border: 1px solid #444;")
+        self.filter_input.textChanged.connect(self.apply_filter)
+
+        # Table View: the model holds every column of the fetched rows; the proxy
+        # does column selection, sorting and filtering without re-querying.
+        self.model = MovieTableModel(self)
+        self.proxy = MovieFilterProxy(self)
+        self.proxy.setSourceModel(self.model)
+        self.proxy.set_visible_columns(self.selected_db_columns())
+        self.table = QTableView()
+        self.table.setModel(self.proxy)
+        # No sort until a header is clicked, so rows start in database order.
+        self.table.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table.setSortingEnabled(True)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 color: white;
                 font-family: Arial, sans-serif;
                 font-size: 14px;
@@ -147,6 +323,7 @@ class Dashboard2(QWidget):
         """)
         self.output_console.setFixedHeight(100)
 
+        right_side_layout.addWidget(self.filter_input)
         right_side_layout.addWidget(self.table)
         right_side_layout.addWidget(self.output_console)
 
@@ -182,6 +359,49 @@ class Dashboard2(QWidget):
     def set_search_mode(self, mode):
         self.search_mode = mode
         self.output_console.append(f"Search mode set to: {mode}")
+        self.schedule_live_search()
+
+    def schedule_live_search(self, text=None):
+        """
+        (Re)start the debounce timer. Restarting drops the search scheduled by the
+        previous keystroke, so only the latest text is ever looked up.
+        """
+        if self.token_index is not None and self.token_index.rows and self.search_mode in INDEXED_FIELDS:
+            self.live_search_timer.start()
+
+    def run_live_search(self):
+        term = self.query_input.text().strip()
+        if not term or self.search_mode not in INDEXED_FIELDS:
+            return
+        start = time.perf_counter()
+        results = self.token_index.search(self.search_mode, term)
+        elapsed = time.perf_counter() - start
+
+        self.cancel_searches()
+        self.current_query = None
+        self.display_results(results, MOVIE_COLUMNS)
+        self.output_console.append(
+            f"Live search '{term}' by {self.search_mode}: {len(results)} records in {elapsed * 1e6:.0f} µs."
+        )
+
+    def selected_db_columns(self):
+        columns_map = {
+            "title": "series_title",
+            "year": "released_year",
+            "genre": "genre",
+            "rating": "imdb_rating",
+            "director": "director",
+            "stars": ["star1", "star2", "star3"],
+        }
+
+        columns = []
+        for col in self.selected_columns:
+            db_col = columns_map[col]
+            if isinstance(db_col, list):
+                columns.extend(db_col)
+            else:
+                columns.append(db_col)
+        return columns
 
     def toggle_column(self, column, button):
         if column in self.selected_columns:
@@ -190,116 +410,412 @@ class Dashboard2(QWidget):
         else:
             self.selected_columns.add(column)
             button.setStyleSheet(self.get_button_style(True))
+        self.proxy.set_visible_columns(self.selected_db_columns())
         self.output_console.append(f"Column toggled: {column}")
 
-    def execute_search(self):
+    def apply_filter(self, text):
+        self.proxy.set_filter_text(text)
+
+    def parse_criterion(self, mode, term):
+        """movie_search() argument for a Search By mode and term; raises ValueError."""
+        if mode == "year":
+            return parse_range(term, int)
+        if mode == "rating":
+            # A single rating means "at least this good".
+            low, high = parse_range(term, float)
+            return low, None if low == high else high
+        # Keyword terms use boolean mode: +nolan -batman, "exact phrase", prefix*
+        return term
+
+    def read_criterion(self):
+        """(mode, term, parsed value) from the search controls, or None after reporting why not."""
         if not self.search_mode:
             self.output_console.append("Please select a Search By mode.")
-            return
+            return None
         term = self.query_input.text().strip()
         if not term:
             self.output_console.append("Please enter a search term.")
+            return None
+        try:
+            return self.search_mode, term, self.parse_criterion(self.search_mode, term)
+        except ValueError:
+            self.output_console.append(
+                f"Invalid {self.search_mode} '{term}'. Use a value, a range like 1990-2000, or 2000+."
+            )
+            return None
+
+    def execute_search(self):
+        if self.filters:
+            # The stacked filters stay in force: the term becomes one more of them.
+            self.add_filter()
+            return
+        criterion = self.read_criterion()
+        if criterion is None:
+            return
+        mode, term, value = criterion
+        self.live_search_timer.stop()
+        # Every column is fetched; the proxy shows the selected ones.
+        query = {"columns": MOVIE_COLUMNS, **movie_search(**{mode: value})}
+        self.run_search(query, f"Search for '{term}' by {mode}")
+
+    def run_search(self, query, label):
+        """Show the results of query: from the table, the in-memory store or the database."""
+        if query == self.current_query and self.search_ticket is None and self.model.rowCount():
+            # Same predicates: the rows are already here.
+            self.output_console.append(f"{label}: results are already shown; not re-querying.")
             return
 
-        mode_map = {
-            "genre": "genre",
-            "year": "released_year",
-            "rating": "imdb_rating",
-            "director": "director",
-            "actor": ["star1", "star2", "star3"],
-        }
+        if self.store is not None and self.store.can_answer(**query):
+            self.cancel_searches()
+            self.current_query = query
+            self.search_store(query, label)
+            return
 
-        columns_map = {
-            "title": "series_title",
-            "year": "released_year",
-            "genre": "genre",
-            "rating": "imdb_rating",
-            "director": "director",
-            "stars": ["star1", "star2", "star3"],
-        }
+        self.start_search(query, label)
 
-        columns_to_fetch = []
-        for col in self.selected_columns:
-            db_col = columns_map[col]
-            if isinstance(db_col, list):
-                columns_to_fetch.extend(db_col)
-            else:
-                columns_to_fetch.append(db_col)
-
-        search_cols = mode_map[self.search_mode]
-
-        results = []
-        if isinstance(search_cols, list):
-            for c in search_cols:
-                rows = self.db.fetch_movies(columns=columns_to_fetch, search_column=c, search_value=term)
-                if rows:
-                    results.extend(rows)
-            # Remove duplicates
-            results = list({tuple(r): r for r in results}.values())
+    def add_filter(self):
+        """Stack the current Search By mode and term onto the filters and search with all of them."""
+        criterion = self.read_criterion()
+        if criterion is None:
+            return
+        mode, term, _ = criterion
+        self.live_search_timer.stop()
+        # Title and keyword are both full-text conditions; a query has only one.
+        self.filters.pop({"title": "keyword", "keyword": "title"}.get(mode), None)
+        self.filters[mode] = term
+        self.query_input.clear()
+        self.refresh_filter_stack()
+        self.search_filters()
+
+    def remove_filter(self, mode):
+        self.filters.pop(mode, None)
+        self.refresh_filter_stack()
+        if self.filters:
+            self.search_filters()
         else:
-            results = self.db.fetch_movies(columns=columns_to_fetch, search_column=search_cols, search_value=term)
+            self.load_movies_data()
 
-        self.display_results(results, columns_to_fetch)
-        self.output_console.append(f"Search for '{term}' by {self.search_mode} returned {len(results) if results else 0} records.")
+    def clear_filters(self):
+        if not self.filters:
+            return
+        self.filters.clear()
+        self.refresh_filter_stack()
+        self.load_movies_data()
 
-    def display_results(self, results, columns):
+    def refresh_filter_stack(self):
+        """Rebuild the stacked filter buttons; clicking one removes that filter."""
+        while self.filter_stack.count():
+            self.filter_stack.takeAt(0).widget().deleteLater()
+        for mode, term in self.filters.items():
+            btn = QPushButton(f"{mode.capitalize()}: {term}  ✕")
+            btn.setStyleSheet(self.get_button_style(True))
+            btn.setToolTip("Remove this filter")
+            btn.clicked.connect(lambda _, m=mode: self.remove_filter(m))
+            self.filter_stack.addWidget(btn)
+
+    def search_filters(self):
+        """Run every stacked filter as one combined query."""
+        values = {mode: self.parse_criterion(mode, term) for mode, term in self.filters.items()}
+        query = {"columns": MOVIE_COLUMNS, **movie_search(**values)}
+        label = "Filters " + ", ".join(f"{mode} '{term}'" for mode, term in self.filters.items())
+        self.run_search(query, label)
+
+    def search_store(self, query, label):
+        """
+        Answer a search from the in-memory store. When a change check is due it
+        runs in the background; the results are refreshed if movies changed.
+        """
+        start = time.perf_counter()
+        rows, token = self.show_store_page(query)
+        elapsed = time.perf_counter() - start
+        more = " (scroll for more)" if token else ""
+        self.output_console.append(
+            f"{label} returned {len(rows)} records{more} "
+            f"from the in-memory store in {elapsed * 1e6:.0f} µs."
+        )
+        if self.sync_ticket is None and self.store.check_due():
+            self.start_store_sync(quiet=True)
+
+    def show_store_page(self, query):
+        """Show the first page of query from the in-memory store; scrolling pages in the rest."""
+        rows, token = self.store.fetch_movies_page(**query, page_size=PAGE_SIZE)
+        self.store_results = True
+        self.next_page_token = token
+        self.display_results(rows, query["columns"], paged=True)
+        return rows, token
+
+    def log_pool_stats(self):
+        stats = self.db.pool_stats()
+        if stats:
+            self.output_console.append(
+                f"Pool: {stats['in_use']}/{stats['size']} in use, "
+                f"avg wait {stats['avg_wait_ms']:.1f} ms, max wait {stats['max_wait_ms']:.1f} ms, "
+                f"timeouts {stats['timeouts']}"
+            )
+
+    def log_cache_stats(self):
+        stats = self.db.cache_stats()
+        if stats:
+            self.output_console.append(
+                f"Cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+                f"{stats['entries']}/{stats['max_entries']} entries, {stats['invalidations']} invalidations"
+            )
+
+    def display_results(self, results, columns, paged=False):
         if not results:
             self.output_console.append("No results found.")
-            self.table.setRowCount(0)
-            self.table.setColumnCount(0)
+            self.model.clear()
             return
 
-        headers_map_rev = {
-            "series_title": "Title",
-            "released_year": "Year",
-            "genre": "Genre",
-            "imdb_rating": "Rating",
-            "director": "Director",
-            "star1": "Star 1",
-            "star2": "Star 2",
-            "star3": "Star 3",
-        }
-
-        self.table.setRowCount(len(results))
-        self.table.setColumnCount(len(columns))
-        header_labels = [headers_map_rev.get(col, col) for col in columns]
-        self.table.setHorizontalHeaderLabels(header_labels)
-
-        for row_idx, row_data in enumerate(results):
-            for col_idx, cell in enumerate(row_data):
-                self.table.setItem(row_idx, col_idx, QTableWidgetItem(str(cell)))
+        if paged:
+            self.model.set_results(results, columns, page_loader=self.load_next_page,
+                                   has_more=self.next_page_token is not None)
+        else:
+            self.model.set_results(results, columns)
+
+    def start_search(self, query, label):
+        """
+        Fetch the first page of query in the background, cancelling any search
+        still running. on_query_finished() shows the results.
+        """
+        self.cancel_searches()
+        self.current_query = query
+        self.next_page_token = None
+        self.store_results = False
+        self.search_label = label
+        self.search_started = time.perf_counter()
+        self.search_ticket = self.runner.submit(
+            lambda handle: self.db.fetch_movies_page(**query, page_size=PAGE_SIZE, handle=handle)
+        )
+
+    def cancel_searches(self, reason="superseded"):
+        """Cancel the running search and page load, if any, on the server too."""
+        self.runner.cancel(self.search_ticket, reason)
+        self.runner.cancel(self.page_ticket, reason)
+        self.search_ticket = self.page_ticket = None
+
+    def load_next_page(self):
+        """
+        Page loader for the table model: store pages are built right here, database
+        pages are fetched in the background.
+        """
+        query, token = self.current_query, self.next_page_token
+        if self.store_results:
+            rows, self.next_page_token = self.store.fetch_movies_page(**query, page_size=PAGE_SIZE, page_token=token)
+            return rows or [], self.next_page_token is not None
+        self.page_ticket = self.runner.submit(
+            lambda handle: self.db.fetch_movies_page(**query, page_size=PAGE_SIZE, page_token=token, handle=handle)
+        )
+        return None
+
+    def on_query_finished(self, ticket, result):
+        rows, token = result
+        if ticket == self.search_ticket:
+            self.search_ticket = None
+            if rows is None:
+                self.output_console.append(f"{self.search_label} failed; see the terminal for details.")
+                return
+            self.next_page_token = token
+            self.display_results(rows, self.current_query["columns"], paged=True)
+            elapsed = time.perf_counter() - self.search_started
+            more = " (scroll for more)" if token else ""
+            self.output_console.append(
+                f"{self.search_label} returned {len(rows)} records{more} in {elapsed * 1000:.0f} ms."
+            )
+            self.log_pool_stats()
+            self.log_cache_stats()
+        elif ticket == self.page_ticket:
+            self.page_ticket = None
+            self.next_page_token = token
+            self.model.page_loaded(rows or [], token is not None)
+
+    def on_query_failed(self, ticket, message):
+        self.output_console.append(f"Query failed: {message}")
+        if ticket == self.search_ticket:
+            self.search_ticket = None
+        elif ticket == self.page_ticket:
+            self.page_ticket = None
+            self.model.page_loaded([], False)
+
+    def on_query_cancelled(self, ticket, reason):
+        if ticket == self.search_ticket:
+            self.search_ticket = None
+            self.output_console.append(f"{self.search_label} cancelled ({reason}).")
+        elif ticket == self.page_ticket:
+            self.page_ticket = None
+            self.output_console.append(f"Loading the next page cancelled ({reason}).")
+            # Leave has_more set so scrolling to the end again retries the page.
+            self.model.page_loaded([], self.next_page_token is not None)
 
     def load_movies_data(self):
-        columns = ["series_title", "released_year", "genre", "imdb_rating", "director", "star1", "star2", "star3"]
-        results = self.db.fetch_movies(columns=columns)
-        self.display_results(results, columns)
-        self.output_console.append(f"Loaded {len(results) if results else 0} records from database.")
-
-    def export_csv(self):
-        if self.table.rowCount() == 0 or self.table.columnCount() == 0:
+        query = {"columns": MOVIE_COLUMNS}
+        if self.store is not None and self.store.loaded:
+            self.current_query = query
+            self.show_store_page(query)
+            self.output_console.append(f"Showing all {len(self.store)} movies from the in-memory store.")
+            return
+        self.start_search(query, "Loading all movies")
+
+    def start_store_sync(self, quiet=False):
+        """
+        Catch the store up with the database on a worker thread, fetching only
+        changed rows, then rewrite the snapshot (if any) and the search-as-you-type index.
+        A store that is not loaded yet is loaded in full.
+
+        Args:
+            quiet (bool): Report only if rows were fetched (periodic change checks).
+        """
+        store, path, live = self.store, self.snapshot, self.live_search
+
+        def sync(handle):
+            start = time.perf_counter()
+            initial = not store.loaded
+            fetched = store.sync()
+            if fetched is None:
+                return None
+            index = None
+            if fetched or initial or (path and not os.path.exists(path)):
+                if path:
+                    store.save_snapshot(path)
+                if live:
+                    index = TokenIndex()
+                    index.build(store)
+            return fetched, index, time.perf_counter() - start, quiet, initial
+
+        self.sync_ticket = self.sync_runner.submit(sync)
+
+    def on_sync_finished(self, ticket, result):
+        self.sync_ticket = None
+        if result is None:
+            self.output_console.append("Syncing the in-memory store failed; see the terminal for details.")
+            self.ensure_index()
+            return
+        fetched, index, elapsed, quiet, initial = result
+        if index is not None:
+            self.token_index = index
+        saved = f"; snapshot saved to {self.snapshot}" if self.snapshot else ""
+        if initial:
+            self.output_console.append(
+                f"Loaded {len(self.store)} movies into the in-memory store in {elapsed * 1000:.0f} ms{saved}."
+            )
+        elif fetched:
+            self.output_console.append(
+                f"Synced the in-memory store: {fetched} changed movies fetched in {elapsed * 1000:.0f} ms "
+                f"({len(self.store)} movies){saved}."
+            )
+        if initial or fetched:
+            query = self.current_query
+            if query is not None and self.search_ticket is None and self.store.can_answer(**query):
+                self.show_store_page(query)
+        elif not quiet:
+            self.output_console.append(f"In-memory store is up to date ({elapsed * 1000:.0f} ms).")
+
+    def on_sync_failed(self, ticket, message):
+        self.sync_ticket = None
+        self.output_console.append(f"Syncing the in-memory store failed: {message}")
+        self.ensure_index()
+
+    def ensure_index(self):
+        """Build the search-as-you-type index from the database if a failed store load left it unbuilt."""
+        if self.live_search and self.token_index is None and not self.store.loaded:
+            self.start_index_build()
+
+    def closeEvent(self, event):
+        self.runner.shutdown()
+        self.export_runner.shutdown()
+        self.sync_runner.shutdown()
+        self.index_runner.shutdown()
+        super().closeEvent(event)
+
+    def export_results(self):
+        """
+        Export the current results, or cancel the export in progress.
+
+        Database searches are re-run as a streaming query on a worker thread, so
+        every matching row is written, not just the pages fetched so far.
+        Search-as-you-type results exist only here and are written directly.
+        """
+        if self.export_ticket is not None:
+            self.export_runner.cancel(self.export_ticket)
+            return
+        columns = self.proxy.visible_columns()
+        if self.model.rowCount() == 0 or not columns:
             self.output_console.append("No data to export.")
             return
 
-        path, _ = QFileDialog.getSaveFileName(self, "Save CSV", "", "CSV Files (*.csv)")
+        path, _ = QFileDialog.getSaveFileName(self, "Export results", "",
+                                              "CSV Files (*.csv);;Parquet Files (*.parquet)")
         if not path:
             return
 
-        headers = [self.table.horizontalHeaderItem(i).text() for i in range(self.table.columnCount())]
+        if self.current_query is None:
+            written = write_rows(path, columns, self.proxy.visible_rows())
+            if written is not None:
+                self.output_console.append(f"Exported {written} records to {path}")
+            return
+
+        if self.filter_input.text().strip() or self.proxy.sortColumn() >= 0:
+            self.output_console.append("The local filter and sort are not applied to exports from the database.")
+        query = self.current_query
+        self.export_path = path
+        self.export_ticket = self.export_runner.submit(
+            lambda handle: export_movies(self.db, path, query, columns, chunk_size=EXPORT_CHUNK_SIZE,
+                                         progress=self.export_progress.emit, handle=handle)
+        )
+        self.export_btn.setText("Cancel export")
+        self.export_bar.setRange(0, 0)   # busy until the first chunk reports a total
+        self.export_bar.show()
+
+    def on_export_progress(self, written, total):
+        if self.export_ticket is None:
+            return   # late report from a cancelled export
+        if total:
+            # Rows added since the count was taken can push written past it.
+            self.export_bar.setRange(0, max(total, written))
+        self.export_bar.setValue(written)
+
+    def on_export_finished(self, ticket, written):
+        if written is None:
+            self.output_console.append("Export failed; see the terminal for details.")
+        else:
+            self.output_console.append(f"Exported {written} records to {self.export_path}")
+        self.end_export()
+
+    def on_export_failed(self, ticket, message):
+        self.output_console.append(f"Export failed: {message}")
+        self.end_export()
 
-        with open(path, mode="w", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            writer.writerow(headers)
-            for row_idx in range(self.table.rowCount()):
-                row = []
-                for col_idx in range(self.table.columnCount()):
-                    item = self.table.item(row_idx, col_idx)
-                    row.append(item.text() if item else "")
-                writer.writerow(row)
+    def on_export_cancelled(self, ticket, reason):
+        self.output_console.append(f"Export to {self.export_path} cancelled ({reason}).")
+        self.end_export()
 
-        self.output_console.append(f"Exported data to {path}")
+    def end_export(self):
+        self.export_ticket = None
+        self.export_btn.setText("Export")
+        self.export_bar.hide()
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    dashboard = Dashboard2()
+    parser = argparse.ArgumentParser(description="CineScope movie dashboard.")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="Read movies from this SQLite database file instead of the MySQL server.")
+    parser.add_argument("--memory-store", action="store_true",
+                        help="Keep a columnar copy of movies in memory and answer searches from it.")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="Start the in-memory store from this snapshot file and keep it synced "
+                             "(created on first run; implies --memory-store).")
+    parser.add_argument("--cache-size", type=int, metavar="N",
+                        help="Cache the results of up to N database searches (60 s TTL; "
+                             "dropped when this process writes to movies).")
+    parser.add_argument("--no-live-search", action="store_true",
+                        help="Do not build the search-as-you-type index at startup.")
+    args, qt_args = parser.parse_known_args()
+
+    app = QApplication(sys.argv[:1] + qt_args)
+    if args.sqlite:
+        db = SQLiteConnector(args.sqlite, pool_size=4, cache_size=args.cache_size)
+    else:
+        db = MySQLConnector(pool_size=4, cache_size=args.cache_size)
+    dashboard = Dashboard2(db, memory_store=args.memory_store, live_search=not args.no_live_search,
+                           snapshot=args.snapshot)
     dashboard.show()
     sys.exit(app.exec())
@@ -0,0 +1,166 @@
+import csv
+import os
+from itertools import count
+
+from base_connector import MOVIE_COLUMNS
+from import_csv import CSV_COLUMNS
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+# movies column -> CSV header, so an exported CSV can be imported again.
+CSV_HEADERS = {column: header for header, column in CSV_COLUMNS.items()}
+
+# Numbers the temporary files of exports running in this process.
+_export_ids = count()
+
+def export_format(path, fmt=None):
+    """Format named by fmt, or guessed from the file extension (CSV by default)."""
+    if fmt is None:
+        fmt = "parquet" if path.lower().endswith(".parquet") else "csv"
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    return fmt
+
+class _CsvWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([CSV_HEADERS.get(column, column) for column in columns])
+
+    def write(self, rows):
+        self.writer.writerows(["" if value is None else value for value in row] for row in rows)
+
+    def close(self):
+        self.file.close()
+
+class _ParquetWriter:
+    def __init__(self, path, columns, pa, pq):
+        types = {"id": pa.int64(), "released_year": pa.int32(), "imdb_rating": pa.float64()}
+        self.pa = pa
+        self.schema = pa.schema([(column, types.get(column, pa.string())) for column in columns])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, rows):
+        # One row group per chunk: memory stays bounded by the chunk size.
+        arrays = [self.pa.array(values, type=field.type) for values, field in zip(zip(*rows), self.schema)]
+        self.writer.write_table(self.pa.Table.from_arrays(arrays, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+def _open_writer(path, columns, fmt):
+    try:
+        if fmt == "csv":
+            return _CsvWriter(path, columns)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Parquet export needs pyarrow (pip install pyarrow).")
+            return None
+        return _ParquetWriter(path, columns, pa, pq)
+    except OSError as e:
+        print(f"Export error: {e}")
+        return None
+
+def _temp_path(path):
+    """
+    Private file next to path for one export. Exports write there and rename it
+    into place only when complete, so an export still running after being
+    cancelled cannot overwrite or delete a newer export to the same path.
+    """
+    return f"{path}.{os.getpid()}-{next(_export_ids)}.tmp"
+
+def _finish(temp_path, path, complete):
+    """Move a complete export into place, or discard it. True if path was written."""
+    try:
+        if complete:
+            os.replace(temp_path, path)
+            return True
+    except OSError as e:
+        print(f"Export error: {e}")
+    os.remove(temp_path)
+    return False
+
+def write_rows(path, columns, rows, fmt=None, chunk_size=5000):
+    """
+    Write rows already in memory to a CSV or Parquet file.
+
+    Returns:
+        int: Rows written, or None if the file could not be written.
+    """
+    fmt = export_format(path, fmt)
+    rows = list(rows)
+    temp_path = _temp_path(path)
+    writer = _open_writer(temp_path, columns, fmt)
+    if writer is None:
+        return None
+    complete = False
+    try:
+        for start in range(0, len(rows), chunk_size):
+            writer.write(rows[start:start + chunk_size])
+        complete = True
+    except OSError as e:
+        print(f"Export error: {e}")
+    finally:
+        writer.close()
+    return len(rows) if _finish(temp_path, path, complete) else None
+
+def export_movies(db, path, query=None, columns=None, fmt=None, chunk_size=5000, progress=None, handle=None):
+    """
+    Stream the movies matching a search from the database into a CSV or Parquet file.
+
+    Rows are read through a server-side cursor and written chunk by chunk, so
+    memory use depends on chunk_size rather than the result size. Meant to run
+    off the GUI thread (e.g. through QueryRunner).
+
+    Args:
+        db (BaseConnector): Connected connector.
+        path (str): Output file, replaced only once the export is complete.
+        query (dict): fetch_movies() filter arguments (search_column, range_filters, ...).
+        columns (list): movies columns to export; defaults to MOVIE_COLUMNS.
+        fmt (str): "csv" or "parquet"; guessed from the extension if None.
+        chunk_size (int): Rows fetched and written per chunk.
+        progress (callable): Called as progress(written, total) after each chunk;
+            total is None if the count query failed.
+        handle (QueryHandle): Lets another thread cancel the export.
+
+    Returns:
+        int: Rows written, or None if the export failed or was cancelled.
+    """
+    fmt = export_format(path, fmt)
+    columns = columns or MOVIE_COLUMNS
+    query = {key: value for key, value in (query or {}).items() if key != "columns"}
+
+    # Only drives the progress bar: rows may be added or deleted while the
+    # export runs, so the final count can differ without anything going wrong.
+    total = db.count_movies(**query)
+    temp_path = _temp_path(path)
+    writer = _open_writer(temp_path, columns, fmt)
+    if writer is None:
+        return None
+
+    written = 0
+    complete = False
+    chunks = db.iter_movies(columns, batch_size=chunk_size, batches=True, handle=handle, **query)
+    try:
+        while True:
+            try:
+                rows = next(chunks)
+            except StopIteration as stop:
+                # iter_movies() reports stream errors itself and returns False.
+                complete = stop.value
+                break
+            writer.write(rows)
+            written += len(rows)
+            if progress:
+                progress(written, total)
+    except OSError as e:
+        print(f"Export error: {e}")
+    finally:
+        chunks.close()   # releases the server-side cursor if the loop stopped early
+        writer.close()
+
+    if not complete and (handle is None or not handle.cancelled):
+        print(f"Export stopped after {written} rows.")
+    return written if _finish(temp_path, path, complete) else None
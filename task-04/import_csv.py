@@ -1,58 +1,574 @@
+import argparse
 import csv
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import count, islice
+from base_connector import BatchInsertResult
 from connector import MySQLConnector
+from sqlite_connector import SQLiteConnector
+from metrics import BatchSizeTuner, StageTimings
 
-def create_table(cursor):
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS movies (
-            id INT AUTO_INCREMENT PRIMARY KEY,
-            series_title VARCHAR(255),
-            released_year INT,
-            genre VARCHAR(255),
-            imdb_rating FLOAT,
-            director VARCHAR(255),
-            star1 VARCHAR(255),
-            star2 VARCHAR(255),
-            star3 VARCHAR(255)
-        )
-    """)
-
-def import_csv_to_mysql(csv_file):
-    db = MySQLConnector()
-    if not db.connect():
-        print("Failed to connect to database.")
+# CSV header -> movies column, in insert order.
+CSV_COLUMNS = {
+    "Series_Title": "series_title",
+    "Released_Year": "released_year",
+    "Genre": "genre",
+    "IMDB_Rating": "imdb_rating",
+    "Director": "director",
+    "Star1": "star1",
+    "Star2": "star2",
+    "Star3": "star3",
+}
+
+INSERT_SQL = """
+    INSERT INTO movies (series_title, released_year, genre, imdb_rating, director, star1, star2, star3)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+# Errors meaning LOAD DATA LOCAL is switched off on the server (1148, 3948)
+# or refused by the client library (2068).
+LOCAL_INFILE_DISABLED = {1148, 2068, 3948}
+
+def row_hash(row):
+    """SHA-1 of a parsed row's values, used to detect unchanged rows."""
+    text = "\x1f".join("" if value is None else str(value) for value in row)
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+def load_row_hashes(db):
+    """Map (series_title, released_year) -> row_hash for every movie already stored."""
+    rows = db.stream_query("SELECT series_title, released_year, row_hash FROM movies ORDER BY id", batch_size=5000)
+    return {(title, year): digest for title, year, digest in rows}
+
+def changed_rows(rows, known_hashes, stats):
+    """
+    Yield (offset, row) pairs with the row's hash appended, skipping rows whose
+    stored hash matches.
+
+    stats["skipped"] counts the unchanged rows.
+    """
+    for offset, row in rows:
+        digest = row_hash(row)
+        if known_hashes.get((row[0], row[1])) == digest:
+            stats["skipped"] += 1
+            continue
+        yield offset, row + (digest,)
+
+def parse_row(row):
+    """Convert one csv.DictReader row into a movies insert tuple."""
+    return (
+        row.get("Series_Title"),
+        int(row.get("Released_Year")) if row.get("Released_Year") and row.get("Released_Year").isdigit() else None,
+        row.get("Genre"),
+        float(row.get("IMDB_Rating")) if row.get("IMDB_Rating") else None,
+        row.get("Director"),
+        row.get("Star1"),
+        row.get("Star2"),
+        row.get("Star3")
+    )
+
+def prefetch(iterable, depth=4, chunk_size=1000):
+    """
+    Run an iterable on a background thread and yield its items here.
+
+    Items are handed over in chunks through a queue of at most depth chunks, so
+    the producer (CSV parsing) overlaps with the consumer (database writes) while
+    memory stays bounded. Exceptions in the producer are re-raised here.
+    """
+    chunks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+
+    def put(item):
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def produce():
+        try:
+            iterator = iter(iterable)
+            while not stop.is_set():
+                chunk = list(islice(iterator, chunk_size))
+                if not chunk:
+                    break
+                put(chunk)
+        except Exception as e:
+            put(e)
+        put(done)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield from item
+    finally:
+        # Lets the producer exit if the consumer stops early.
+        stop.set()
+
+class ImportCheckpoint:
+    """
+    Resume point for an interrupted import, persisted as JSON next to the CSV.
+
+    Records the byte offset just past the last committed row, so a resumed
+    import seeks straight there instead of re-reading the file. Parallel imports
+    commit out of order; byte ranges committed beyond that offset are kept too,
+    and their rows are skipped on resume.
+    """
+
+    def __init__(self, csv_file, path=None):
+        self.csv_file = os.path.abspath(csv_file)
+        self.path = path or self.csv_file + ".checkpoint"
+        self.offset = 0
+        self.rows = 0
+        self.batches = 0
+        self.ranges = []    # sorted [start, end] byte ranges committed past offset
+        self._file_size = os.path.getsize(csv_file)
+
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as file:
+                state = json.load(file)
+            # A checkpoint for a different or rewritten file is useless.
+            if state.get("csv_file") == self.csv_file and state.get("file_size") == self._file_size:
+                self.offset = state["offset"]
+                self.rows = state["rows"]
+                self.batches = state["batches"]
+                self.ranges = state.get("ranges", [])
+
+    def committed(self, offset, rows, batches=1, start=None):
+        """
+        Record a committed transaction and persist the new position.
+
+        Args:
+            offset (int): Byte offset just past the transaction's last row.
+            start (int): Byte offset its first row follows. Defaults to the
+                current position, i.e. it carried on where the last one ended;
+                a range starting further on is kept until the gap before it is
+                committed too.
+        """
+        start = self.offset if start is None else start
+        merged = []
+        for low, high in sorted(self.ranges + [[start, offset]]):
+            if merged and low <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], high)
+            else:
+                merged.append([low, high])
+        while merged and merged[0][0] <= self.offset:
+            self.offset = max(self.offset, merged.pop(0)[1])
+        self.ranges = merged
+        self.rows += rows
+        self.batches += batches
+        state = {
+            "csv_file": self.csv_file,
+            "file_size": self._file_size,
+            "offset": self.offset,
+            "rows": self.rows,
+            "batches": self.batches,
+            "ranges": self.ranges,
+        }
+        temp_path = self.path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(temp_path, self.path)
+
+    def uncommitted(self, rows):
+        """Drop (offset, row) pairs inside ranges already committed past the offset."""
+        ranges = [tuple(bounds) for bounds in self.ranges]
+        for offset, row in rows:
+            while ranges and ranges[0][1] < offset:
+                ranges.pop(0)
+            if ranges and ranges[0][0] < offset:
+                continue
+            yield offset, row
+
+    def clear(self):
+        """Forget the saved position, e.g. once the import has finished."""
+        self.offset = self.rows = self.batches = 0
+        self.ranges = []
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+def read_rows(csv_file, start_offset=0):
+    """
+    Reader stage: yield (offset, row) pairs from the CSV without holding it in memory.
+
+    offset is the byte position just past the row, usable as start_offset to
+    resume after it. The header is always read from the top of the file.
+    """
+    with open(csv_file, "rb") as file:
+        fieldnames = next(csv.reader([file.readline().decode("utf-8-sig")]))
+        if start_offset:
+            file.seek(start_offset)
+        position = file.tell()
+
+        def lines():
+            nonlocal position
+            for line in file:
+                position += len(line)
+                yield line.decode("utf-8")
+
+        # csv pulls exactly the lines of one record before yielding it, so
+        # position is the end of that record.
+        for row in csv.DictReader(lines(), fieldnames=fieldnames):
+            yield position, row
+
+def parsed_rows(csv_file, start_offset=0, timings=None):
+    """
+    Reader and parser stages: yield (offset, movies insert tuple) pairs.
+
+    With timings (a StageTimings), CSV reading is charged to "csv parse" and
+    parse_row() to "type conversion".
+    """
+    rows = read_rows(csv_file, start_offset)
+    if timings is None:
+        for offset, row in rows:
+            yield offset, parse_row(row)
         return
 
-    cursor = db.connection.cursor()
-    create_table(cursor)
+    for offset, row in timings.timed("csv parse", rows):
+        started = time.perf_counter()
+        parsed = parse_row(row)
+        timings.add("type conversion", time.perf_counter() - started)
+        yield offset, parsed
 
-    batch_data = []
+def batched(rows, batch_size, tuner=None):
+    """
+    Batcher stage: group (offset, row) pairs into (rows, end offset) batches.
 
-    with open(csv_file, "r", encoding="utf-8") as file:
-        reader = csv.DictReader(file)
-        for row in reader:
-            batch_data.append((
-                row.get("Series_Title"),
-                int(row.get("Released_Year")) if row.get("Released_Year") and row.get("Released_Year").isdigit() else None,
-                row.get("Genre"),
-                float(row.get("IMDB_Rating")) if row.get("IMDB_Rating") else None,
-                row.get("Director"),
-                row.get("Star1"),
-                row.get("Star2"),
-                row.get("Star3")
-            ))
+    With a BatchSizeTuner, each batch takes the tuner's current size.
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, tuner.batch_size if tuner else batch_size))
+        if not chunk:
+            return
+        yield [row for _, row in chunk], chunk[-1][0]
 
-    insert_sql = """
-        INSERT INTO movies (series_title, released_year, genre, imdb_rating, director, star1, star2, star3)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+def insert_rows(db, rows, insert_sql=INSERT_SQL, batch_size=1000, commit_every=1, checkpoint=None, tuner=None):
     """
+    Stream parsed rows into movies: reader -> parser -> batcher -> writer.
+
+    Parsing runs on a background thread while insert_batches() writes, and no
+    stage holds more than a few batches, so memory does not grow with file size.
+
+    Args:
+        rows (iterable): (offset, row) pairs from parsed_rows().
+        commit_every (int): Batches per transaction.
+        checkpoint (ImportCheckpoint): Updated after every commit, if given.
+        tuner (BatchSizeTuner): Adjusts the batch size from observed write latency.
+
+    Returns:
+        BatchInsertResult
+    """
+    on_commit = checkpoint.committed if checkpoint else None
+    on_batch = tuner.record if tuner else None
+    batches = prefetch(batched(rows, batch_size, tuner), chunk_size=1)
+    return db.insert_batches(insert_sql, batches, commit_every=commit_every, on_commit=on_commit,
+                             on_batch=on_batch)
+
+def insert_rows_parallel(db, rows, insert_sql=INSERT_SQL, workers=4, batch_size=1000, commit_every=1,
+                         checkpoint=None, tuner=None):
+    """
+    Parse rows on this thread and insert batches with several connections at once.
+
+    Groups of commit_every batches go through a shared queue (the executor's) to
+    `workers` threads, each running insert_batches() as one transaction on its own
+    pooled connection. At most two groups per worker are in flight, so memory
+    stays bounded. Groups finish out of order, so each one is checkpointed as the
+    byte range it covers. Batches are numbered across the whole import. db must
+    be pooled with at least `workers` connections.
+
+    Returns:
+        BatchInsertResult
+    """
+    batches = batched(rows, batch_size, tuner)
+    on_batch = tuner.record if tuner else None
+    result = BatchInsertResult()
+    pending = {}      # future -> (start offset, end offset) of the group's rows
+    group_start = checkpoint.offset if checkpoint else 0
+    failed = False
+
+    def collect(done):
+        nonlocal failed
+        for future in done:
+            start_offset, end_offset = pending.pop(future)
+            group_result = future.result()
+            result.merge(group_result)
+            if group_result.failed_batches:
+                failed = True
+            elif checkpoint:
+                checkpoint.committed(end_offset, group_result.rows_inserted, group_result.batches_committed,
+                                     start=start_offset)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="import-writer") as executor:
+        for group_number in count():
+            group = list(islice(batches, commit_every))
+            if not group or failed:
+                break
+            if len(pending) >= workers * 2:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+            future = executor.submit(db.insert_batches, insert_sql, group, commit_every=commit_every,
+                                     on_commit=None, stop_on_error=True, verbose=False, on_batch=on_batch,
+                                     first_batch=group_number * commit_every + 1)
+            pending[future] = (group_start, group[-1][1])
+            group_start = group[-1][1]
+        collect(wait(pending).done)
+    result.seconds = time.perf_counter() - start
+
+    print(f"Inserted {result.rows_inserted} rows successfully using {workers} writer connections.")
+    return result
+
+def write_clean_csv(csv_file):
+    """
+    Write only the movies columns, already parsed, to a temporary CSV.
+
+    Returns the temporary file path; the caller removes it.
+    """
+    fd, path = tempfile.mkstemp(suffix=".csv")
+    with os.fdopen(fd, "w", newline="", encoding="utf-8") as target:
+        writer = csv.writer(target)
+        writer.writerow(CSV_COLUMNS.keys())
+        for _, row in read_rows(csv_file):
+            writer.writerow(["" if value is None else value for value in parse_row(row)])
+    return path
+
+def load_data_infile(db, csv_file, preclean=False):
+    """
+    Bulk load the CSV with LOAD DATA LOCAL INFILE, letting the server parse it.
+
+    CSV columns are mapped to movies columns by header name and any others are
+    skipped. Released_Year values that are not plain digits and empty
+    IMDB_Rating values become NULL, matching parse_row().
+
+    Args:
+        db (MySQLConnector): Connector created with allow_local_infile=True.
+        csv_file (str): Path to the CSV file.
+        preclean (bool): Parse the file in Python first and load a trimmed copy.
+
+    Returns:
+        int: Rows loaded, or None if LOCAL INFILE is disabled on either side or
+        the backend has no LOAD DATA.
+    """
+    if not db.supports_load_data:
+        return None
+    source = write_clean_csv(csv_file) if preclean else csv_file
+    try:
+        with open(source, "rb") as file:
+            first_line = file.readline()
+        line_end = "\\r\\n" if first_line.endswith(b"\r\n") else "\\n"
+        header = next(csv.reader([first_line.decode("utf-8-sig")]))
+
+        variables = [f"@{CSV_COLUMNS[name]}" if name in CSV_COLUMNS else "@skip" for name in header]
+        missing = [name for name in CSV_COLUMNS if name not in header]
+        if missing:
+            print(f"CSV is missing columns: {', '.join(missing)}")
+            return 0
+
+        sql = f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE movies
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '{line_end}'
+            IGNORE 1 LINES
+            ({", ".join(variables)})
+            SET series_title = @series_title,
+                released_year = IF(@released_year REGEXP '^[0-9]+$', @released_year, NULL),
+                genre = @genre,
+                imdb_rating = NULLIF(@imdb_rating, ''),
+                director = @director,
+                star1 = @star1,
+                star2 = @star2,
+                star3 = @star3
+        """
+
+        with db.checkout() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(sql, (os.path.abspath(source),))
+                loaded = cursor.rowcount
+                connection.commit()
+                db._invalidate_cache()
+                return loaded
+            except db.driver_errors as e:
+                connection.rollback()
+                if getattr(e, "errno", None) in LOCAL_INFILE_DISABLED:
+                    return None
+                print(f"LOAD DATA error: {e}")
+                return 0
+            finally:
+                cursor.close()
+    finally:
+        if preclean:
+            os.remove(source)
+
+def report_import_stats(timings, result, tuner=None):
+    """Print per-stage timings, the batch latency histogram and autotuning outcome."""
+    timings.add("network", result.execute_seconds)
+    timings.add("commit", result.commit_seconds)
+    print(f"Stage times (parsing overlaps writes): {timings.format()}")
+    latencies = result.latencies
+    if latencies.count:
+        print(f"Batch latency: {latencies.count} batches, avg {latencies.total / latencies.count * 1000:.1f} ms, "
+              f"p50 <= {latencies.percentile(0.5)} ms, p95 <= {latencies.percentile(0.95)} ms")
+        print(latencies.format())
+    if tuner:
+        print(f"Autotuned batch size: best {tuner.best_size} rows ({tuner.best_rate:,.0f} rows/sec), "
+              f"final {tuner.batch_size}.")
+
+def import_csv_to_mysql(csv_file, db=None, normalize=False, fast=False, preclean=False, workers=1,
+                        incremental=False, commit_every=1, resume=False, autotune=False, sqlite=None):
+    """
+    Import movies.csv into the movies table.
+
+    Args:
+        csv_file (str): Path to the CSV file.
+        db (MySQLConnector or SQLiteConnector): Optional already-connected connector
+            (e.g. a pooled one shared with the dashboard). A private connection is
+            opened otherwise.
+        normalize (bool): Also populate the normalized genres/people tables used
+            for indexed genre and person searches.
+        fast (bool): Try LOAD DATA LOCAL INFILE first, falling back to batched
+            inserts when local infile is disabled.
+        preclean (bool): With fast, parse and trim the CSV in Python before loading.
+        workers (int): Number of parallel writer connections for batched inserts.
+        incremental (bool): Upsert on (series_title, released_year) and skip rows
+            whose content hash is unchanged, so re-running on the same file writes
+            nothing. Rows without a year are keyed as year 0, so a title appears
+            at most once among them.
+        commit_every (int): Batches of 1000 rows per transaction for batched inserts.
+        resume (bool): Continue from the checkpoint left by an interrupted batched
+            import of the same file instead of starting over.
+        autotune (bool): Adjust the batch size during batched imports toward the
+            best observed throughput.
+        sqlite (str): Without db, import into this SQLite database file instead of MySQL.
+
+    Returns:
+        int: Number of rows imported, or None if the database is unreachable.
+    """
+    owns_db = db is None
+    if owns_db:
+        pool_size = workers if workers > 1 else None
+        if sqlite:
+            db = SQLiteConnector(sqlite, pool_size=pool_size)
+        else:
+            db = MySQLConnector(allow_local_infile=fast, pool_size=pool_size)
+        if not db.connect():
+            print("Failed to connect to database.")
+            return None
+
+    if workers > 1 and (db.pool is None or db.pool.max_size < workers):
+        print(f"Connector pool is smaller than {workers} writers; importing with one connection.")
+        workers = 1
+
+    db.create_movies_table()
+    if incremental:
+        db.ensure_incremental_schema()
+
+    # Once the normalized tables exist, searches read them instead of movies, so
+    # every later import relinks the movies it writes; otherwise new movies would
+    # be missed. The stamp taken before the import limits the relink to them.
+    relink = db.has_normalized_schema()
+    since = db.movies_change_stamp() if relink else None
+
+    if incremental and fast:
+        print("Incremental imports compare row hashes in Python; ignoring --fast.")
+        fast = False
+
+    checkpoint = ImportCheckpoint(csv_file)
+    if not resume:
+        checkpoint.clear()
+    elif checkpoint.offset or checkpoint.ranges:
+        if fast:
+            print("Resuming a checkpointed import; ignoring --fast.")
+            fast = False
+        print(f"Resuming after {checkpoint.rows} rows ({checkpoint.batches} batches) at byte {checkpoint.offset}.")
+        if checkpoint.ranges:
+            print(f"Skipping {len(checkpoint.ranges)} later byte ranges already committed by parallel writers.")
+
+    start = time.perf_counter()
+    imported = None
+    method = "LOAD DATA LOCAL INFILE"
+    insert_sql = INSERT_SQL
+    timings = StageTimings()
+    tuner = BatchSizeTuner() if autotune else None
+    rows = parsed_rows(csv_file, checkpoint.offset, timings)
+    if checkpoint.ranges:
+        rows = checkpoint.uncommitted(rows)
+    stats = {"skipped": 0}
+    if incremental:
+        insert_sql = db.upsert_sql
+        rows = changed_rows(rows, load_row_hashes(db), stats)
+    if fast:
+        imported = load_data_infile(db, csv_file, preclean=preclean)
+        if imported is None:
+            print("LOAD DATA LOCAL INFILE is unavailable; falling back to batched inserts.")
+    if imported is None:
+        if workers > 1:
+            method = f"batched inserts ({workers} writers)"
+            result = insert_rows_parallel(db, rows, insert_sql, workers=workers, commit_every=commit_every,
+                                          checkpoint=checkpoint, tuner=tuner)
+        else:
+            method = "batched inserts"
+            result = insert_rows(db, rows, insert_sql, commit_every=commit_every, checkpoint=checkpoint,
+                                 tuner=tuner)
+        if incremental:
+            method = f"incremental upserts, {stats['skipped']} unchanged rows skipped"
+        imported = result.rows_inserted
+        report_import_stats(timings, result, tuner)
+        if result.failed_batches:
+            print(f"Failed batches: {result.failed_batches}. Re-run with --resume to continue "
+                  f"after the last committed batch.")
+        else:
+            checkpoint.clear()
+    elapsed = time.perf_counter() - start
 
-    db.batch_insert(insert_sql, batch_data)
+    if normalize or relink:
+        db.create_normalized_tables()
+        db.populate_normalized_tables(changed_since=since)
+        print("Populated normalized genre and people tables.")
 
-    cursor.close()
-    db.disconnect()
+    if owns_db:
+        db.disconnect()
 
-    print(f"Imported {len(batch_data)} rows from {csv_file} into the database successfully!")
+    rate = imported / elapsed if elapsed > 0 else 0
+    print(f"Imported {imported} rows from {csv_file} via {method} in {elapsed:.2f}s ({rate:,.0f} rows/sec).")
+    return imported
 
 if __name__ == "__main__":
-    import_csv_to_mysql("movies.csv")
+    parser = argparse.ArgumentParser(description="Import movies.csv into MySQL (or SQLite).")
+    parser.add_argument("csv_file", nargs="?", default="movies.csv")
+    parser.add_argument("--normalize", action="store_true",
+                        help="Also build the normalized genre/people tables for indexed searches.")
+    parser.add_argument("--fast", action="store_true",
+                        help="Bulk load with LOAD DATA LOCAL INFILE (falls back to batched inserts).")
+    parser.add_argument("--preclean", action="store_true",
+                        help="With --fast, clean the CSV in Python before loading it.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Parallel writer connections for batched inserts.")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Upsert by (title, year) and skip unchanged rows; safe to re-run.")
+    parser.add_argument("--commit-every", type=int, default=1,
+                        help="Batches of 1000 rows per transaction.")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted import from its checkpoint file.")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Adjust the batch size during the run toward the best throughput.")
+    parser.add_argument("--sqlite", metavar="PATH",
+                        help="Import into this SQLite database file instead of the MySQL server.")
+    args = parser.parse_args()
+    import_csv_to_mysql(args.csv_file, normalize=args.normalize, fast=args.fast, preclean=args.preclean,
+                        workers=args.workers, incremental=args.incremental, commit_every=args.commit_every,
+                        resume=args.resume, autotune=args.autotune, sqlite=args.sqlite)
 
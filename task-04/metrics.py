@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import defaultdict
+
+
+class LatencyHistogram:
+    """Counts of latencies in power-of-two millisecond buckets (<=1ms, <=2ms, <=4ms, ...)."""
+
+    def __init__(self):
+        self.buckets = defaultdict(int)
+        self.count = 0
+        self.total = 0.0
+
+    def record(self, seconds):
+        ms = seconds * 1000
+        bound = 1
+        while ms > bound:
+            bound *= 2
+        self.buckets[bound] += 1
+        self.count += 1
+        self.total += seconds
+
+    def merge(self, other):
+        for bound, count in other.buckets.items():
+            self.buckets[bound] += count
+        self.count += other.count
+        self.total += other.total
+
+    def percentile(self, fraction):
+        """Upper bound in ms of the bucket holding the given fraction of samples."""
+        if not self.count:
+            return 0
+        target = fraction * self.count
+        seen = 0
+        for bound in sorted(self.buckets):
+            seen += self.buckets[bound]
+            if seen >= target:
+                return bound
+        return max(self.buckets)
+
+    def format(self):
+        lines = []
+        peak = max(self.buckets.values(), default=0)
+        for bound in sorted(self.buckets):
+            count = self.buckets[bound]
+            bar = "#" * max(1, round(30 * count / peak))
+            lines.append(f"  <= {bound:>6} ms {count:>7}  {bar}")
+        return "\n".join(lines)
+
+
+class StageTimings:
+    """Accumulated wall time per pipeline stage."""
+
+    def __init__(self):
+        self.seconds = defaultdict(float)
+
+    def add(self, stage, seconds):
+        self.seconds[stage] += seconds
+
+    def timed(self, stage, iterable):
+        """Yield from iterable, charging the time spent producing each item to stage."""
+        iterator = iter(iterable)
+        while True:
+            start = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                self.seconds[stage] += time.perf_counter() - start
+                return
+            self.seconds[stage] += time.perf_counter() - start
+            yield item
+
+    def format(self):
+        return ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in self.seconds.items())
+
+
+class BatchSizeTuner:
+    """
+    Hill-climbing batch size controller.
+
+    Throughput is measured over windows of a few batches. While it improves the
+    size keeps moving in the same direction; when it drops the direction flips,
+    the step shrinks, and the next step starts from the best size seen so far,
+    so the size settles around the best observed throughput.
+    """
+
+    def __init__(self, batch_size=1000, minimum=100, maximum=50000, window=5, factor=1.5):
+        self.batch_size = batch_size
+        self.minimum = minimum
+        self.maximum = maximum
+        self.window = window
+        self.factor = factor
+        self.best_size = batch_size
+        self.best_rate = 0.0
+        self.history = []          # (batch size, rows/sec) per window
+        self._direction = 1
+        self._last_rate = None
+        self._rows = 0
+        self._seconds = 0.0
+        self._batches = 0
+        self._lock = threading.Lock()
+
+    def record(self, rows, seconds):
+        """Report one batch's row count and the time it took to write. Thread-safe."""
+        with self._lock:
+            self._record(rows, seconds)
+
+    def _record(self, rows, seconds):
+        self._rows += rows
+        self._seconds += seconds
+        self._batches += 1
+        if self._batches < self.window or self._seconds <= 0:
+            return
+
+        rate = self._rows / self._seconds
+        self.history.append((self.batch_size, rate))
+        if rate > self.best_rate:
+            self.best_rate, self.best_size = rate, self.batch_size
+
+        base = self.batch_size
+        if self._last_rate is not None and rate < self._last_rate:
+            self._direction = -self._direction
+            self.factor = max(1.05, self.factor ** 0.5)
+            base = self.best_size
+        self._last_rate = rate
+
+        new_size = round(base * self.factor ** self._direction)
+        self.batch_size = min(self.maximum, max(self.minimum, new_size))
+        self._rows = 0
+        self._seconds = 0.0
+        self._batches = 0
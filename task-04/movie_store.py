@@ -0,0 +1,528 @@
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from base_connector import MOVIE_COLUMNS, NORMALIZED_COLUMNS, RANGE_COLUMNS, name_words
+
+STRING_COLUMNS = ["series_title", "genre", "director", "star1", "star2", "star3"]
+NUMERIC_ARRAYS = ["id", "year_valid", "released_year", "imdb_rating", "rating32"]
+
+# Snapshot file: magic, 8-byte header length, JSON header (stamps, array offsets),
+# then the raw arrays, each starting on a SNAPSHOT_ALIGN boundary. String
+# dictionaries are arrays too (offsets, UTF-8 blob, NULL flags), so the header
+# stays small and nothing in the file is parsed in proportion to the rows.
+SNAPSHOT_MAGIC = b"MOVIESNAP2\n"
+SNAPSHOT_ALIGN = 64
+
+class DictionaryColumn:
+    """
+    Dictionary-encoded string column: each distinct value is stored once and
+    rows hold an int32 code into the dictionary.
+
+    A string predicate is evaluated once per distinct value and then expanded to
+    rows with a single take(), so its cost depends on the dictionary size rather
+    than the row count.
+
+    A column opened from a snapshot keeps its dictionary as UTF-8 bytes in mapped
+    arrays (see from_buffers()): take() decodes only the values of the rows it
+    returns, and the whole dictionary is decoded and casefolded only when a
+    search first needs it.
+    """
+
+    def __init__(self, values):
+        codes = {}
+        self._set(np.fromiter((codes.setdefault(value, len(codes)) for value in values),
+                              dtype=np.int32, count=len(values)), list(codes))
+
+    @classmethod
+    def from_codes(cls, codes, values):
+        """Column from existing codes (e.g. a memory-mapped array) and its dictionary."""
+        column = cls.__new__(cls)
+        column._set(codes, values)
+        return column
+
+    @classmethod
+    def from_buffers(cls, codes, offsets, blob, nulls):
+        """
+        Column over a dictionary stored as buffers() returns it, without decoding it.
+
+        Args:
+            codes (ndarray): int32 code per row.
+            offsets (ndarray): int64; value i is blob[offsets[i]:offsets[i + 1]].
+            blob (ndarray): uint8 UTF-8 bytes of every value, back to back.
+            nulls (ndarray): bool per value; True for NULL.
+        """
+        column = cls.__new__(cls)
+        column.codes = codes
+        column._values = None
+        column._folded = None
+        column._buffers = offsets, blob, nulls
+        return column
+
+    def _set(self, codes, values):
+        self.codes = codes
+        self._values = np.empty(len(values), dtype=object)
+        self._values[:] = values
+        self._folded = None
+        self._buffers = None
+
+    @property
+    def values(self):
+        """The dictionary as an object array, decoded from the buffers on first use."""
+        if self._values is None:
+            offsets, _, nulls = self._buffers
+            values = np.empty(len(nulls), dtype=object)
+            values[:] = [self._decode(code) for code in range(len(nulls))]
+            self._values = values
+        return self._values
+
+    def _decode(self, code):
+        offsets, blob, nulls = self._buffers
+        if nulls[code]:
+            return None
+        return blob[offsets[code]:offsets[code + 1]].tobytes().decode("utf-8")
+
+    def buffers(self):
+        """(offsets, blob, nulls) arrays holding the dictionary, for a snapshot."""
+        if self._buffers is not None:
+            return self._buffers
+        encoded = [b"" if value is None else value.encode("utf-8") for value in self._values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        nulls = np.array([value is None for value in self._values], dtype=bool)
+        return offsets, blob, nulls
+
+    def with_values(self, rows, values, size):
+        """
+        Copy of the column grown to size rows, with values written at rows.
+        Rows past the current end must all be written.
+        """
+        dictionary = self.values.tolist()
+        lookup = {value: code for code, value in enumerate(dictionary)}
+        new_codes = []
+        for value in values:
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(dictionary)
+                dictionary.append(value)
+            new_codes.append(code)
+        codes = np.empty(size, dtype=np.int32)
+        codes[:len(self.codes)] = self.codes
+        codes[rows] = new_codes
+        return DictionaryColumn.from_codes(codes, dictionary)
+
+    def match(self, predicate):
+        """Row mask of values (casefolded, NULLs excluded) for which predicate is true."""
+        folded = self._folded
+        if folded is None:
+            folded = self._folded = [None if value is None else value.casefold() for value in self.values]
+        lookup = np.fromiter((value is not None and predicate(value) for value in folded),
+                             dtype=bool, count=len(folded))
+        return lookup[self.codes]
+
+    def take(self, rows):
+        codes = self.codes[rows]
+        if self._values is not None or len(codes) >= len(self._buffers[2]):
+            return self.values[codes].tolist()
+        # A page of a mapped column: decode just the values it shows.
+        unique, inverse = np.unique(codes, return_inverse=True)
+        values = np.empty(len(unique), dtype=object)
+        values[:] = [self._decode(code) for code in unique]
+        return values[inverse].tolist()
+
+class MovieStore:
+    """
+    In-process columnar copy of the movies table for answering dashboard searches
+    without a database round-trip.
+
+    released_year and imdb_rating are NumPy arrays (NULLs tracked by a mask / NaN),
+    string columns are dictionary-encoded, and a search is a handful of vectorized
+    mask operations. Full-text searches are not answered here (MySQL's FULLTEXT
+    ranking, stopwords and word-length rules are not reproduced); fetch_movies()
+    returns None for them and the caller asks the database instead.
+
+    The store can be saved to a snapshot file and mapped back in at the next
+    start (save_snapshot() / open_snapshot()), then brought up to date with
+    sync(), which fetches only the rows changed since the snapshot.
+    """
+
+    def __init__(self, db, check_interval=5.0):
+        """
+        Args:
+            db (BaseConnector): Connected connector to load from.
+            check_interval (float): Seconds after a load or sync before check_due()
+                asks for another change check.
+        """
+        self.db = db
+        self.check_interval = check_interval
+        self.version = None
+        self.change_stamp = None
+        self.load_seconds = 0.0
+        self._checked_at = 0.0
+        self._data = None
+        # load() and sync() may run on a worker thread while searches are answered.
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return 0 if self._data is None else len(self._data["id"])
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def load(self):
+        """
+        Read the whole movies table into columnar arrays, replacing any previous copy.
+
+        Returns:
+            bool: True on success. On failure the previous copy is kept.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            version = self.db.movies_version()
+            if version is None:
+                return False
+            # Taken before reading, so rows changed during the read are fetched by the next sync().
+            change_stamp = self.db.movies_change_stamp()
+
+            columns = {name: [] for name in ["id"] + MOVIE_COLUMNS}
+            names = list(columns)
+            rows = self.db.stream_query(f"SELECT id, {', '.join(MOVIE_COLUMNS)} FROM movies ORDER BY id",
+                                        batch_size=5000, batches=True)
+            for batch in rows:
+                for name, values in zip(names, zip(*batch)):
+                    columns[name].extend(values)
+
+            if len(columns["id"]) != version[0]:
+                # The stream failed part way or the table changed while it was read.
+                print("Movie store load was incomplete; keeping the previous copy.")
+                return False
+
+            data = self._encode(columns)
+            for name in STRING_COLUMNS:
+                data[name] = DictionaryColumn(columns[name])
+
+            self._data = data
+            self.version = _version_key(version)
+            self.change_stamp = change_stamp
+            self._checked_at = time.monotonic()
+            self.load_seconds = time.perf_counter() - start
+            return True
+
+    def _encode(self, columns):
+        """NumPy arrays for the id and numeric columns of column-value lists."""
+        years = columns["released_year"]
+        ratings = columns["imdb_rating"]
+        data = {
+            "id": np.array(columns["id"], dtype=np.int64),
+            "year_valid": np.array([year is not None for year in years], dtype=bool),
+            "released_year": np.array([0 if year is None else year for year in years], dtype=np.int32),
+            # Display values keep the driver's doubles; filtering uses single precision
+            # like the FLOAT column does in the database (see RANGE_COLUMNS).
+            "imdb_rating": np.array([np.nan if rating is None else rating for rating in ratings], dtype=np.float64),
+        }
+        data["rating32"] = data["imdb_rating"].astype(np.float32)
+        return data
+
+    def sync(self):
+        """
+        Bring the store up to date with the movies table.
+
+        Only rows inserted or updated since the last load, sync or snapshot are
+        fetched (by their updated_at stamp) and merged in. A full load() is done
+        instead when nothing is loaded yet, the table has no change tracking, or
+        rows were deleted (deletes leave no stamp; they show up as a count mismatch).
+
+        Returns:
+            int: Rows fetched, 0 if the store was already current, or None if error.
+        """
+        with self._lock:
+            version = self.db.movies_version()
+            if version is None:
+                return None
+            version = _version_key(version)
+            self._checked_at = time.monotonic()
+            if self.loaded and version == self.version:
+                return 0
+            if not self.loaded or self.change_stamp is None:
+                return len(self) if self.load() else None
+
+            change_stamp = self.db.movies_change_stamp()
+            rows = self.db.fetch_movies_changed(self.change_stamp, ["id"] + MOVIE_COLUMNS)
+            if rows is None:
+                return None
+            data = self._merged(rows) if rows else self._data
+            if len(data["id"]) != version[0]:
+                return len(self) if self.load() else None
+
+            self._data = data
+            self.version = version
+            self.change_stamp = change_stamp
+            return len(rows)
+
+    def _merged(self, rows):
+        """Copy of the store's arrays with rows ((id, *MOVIE_COLUMNS) tuples) updated or added."""
+        data = self._data
+        ids = data["id"]
+        columns = dict(zip(["id"] + MOVIE_COLUMNS, (list(values) for values in zip(*rows))))
+        delta = self._encode(columns)
+
+        # Rows already present are overwritten in place; new ones go at the end.
+        positions = np.searchsorted(ids, delta["id"])
+        found = positions < len(ids)
+        found[found] = ids[positions[found]] == delta["id"][found]
+        added = int(np.count_nonzero(~found))
+        size = len(ids) + added
+        positions[~found] = np.arange(len(ids), size)
+
+        merged = {}
+        for name in NUMERIC_ARRAYS:
+            array = np.empty(size, dtype=data[name].dtype)
+            array[:len(ids)] = data[name]
+            array[positions] = delta[name]
+            merged[name] = array
+        for name in STRING_COLUMNS:
+            merged[name] = data[name].with_values(positions, columns[name], size)
+
+        if added and len(ids) and merged["id"][len(ids)] < ids[-1]:
+            # New ids below the old maximum (e.g. set explicitly): restore id order.
+            order = np.argsort(merged["id"], kind="stable")
+            for name in NUMERIC_ARRAYS:
+                merged[name] = merged[name][order]
+            for name in STRING_COLUMNS:
+                merged[name] = DictionaryColumn.from_codes(merged[name].codes[order], merged[name].values.tolist())
+        return merged
+
+    def check_due(self):
+        """
+        True once check_interval seconds have passed since the table was last
+        checked, i.e. a sync() is worth running. Costs no query, so callers on the
+        GUI thread can ask before each search and run sync() on a worker.
+        """
+        return self.loaded and time.monotonic() - self._checked_at >= self.check_interval
+
+    def save_snapshot(self, path):
+        """
+        Write the store to a snapshot file for open_snapshot(). The file is
+        written next to path and renamed over it, so readers never see half a file.
+
+        Returns:
+            bool: True on success.
+        """
+        with self._lock:
+            if not self.loaded:
+                return False
+            arrays = {name: self._data[name] for name in NUMERIC_ARRAYS}
+            for name in STRING_COLUMNS:
+                column = self._data[name]
+                arrays[f"{name}.codes"] = column.codes
+                (arrays[f"{name}.offsets"], arrays[f"{name}.blob"],
+                 arrays[f"{name}.nulls"]) = column.buffers()
+
+            layout, offset = {}, 0
+            for name, array in arrays.items():
+                layout[name] = [array.dtype.str, len(array), offset]
+                offset += _aligned(array.nbytes)
+            header = json.dumps({
+                "source": self._source(),
+                "version": self.version,
+                "change_stamp": self.change_stamp,
+                "saved_at": time.time(),
+                "arrays": layout,
+            }).encode("utf-8")
+
+            temp_path = f"{path}.tmp"
+            try:
+                with open(temp_path, "wb") as file:
+                    file.write(SNAPSHOT_MAGIC)
+                    file.write(struct.pack("<Q", len(header)))
+                    file.write(header)
+                    file.write(b"\0" * (_aligned(file.tell()) - file.tell()))
+                    for array in arrays.values():
+                        file.write(np.ascontiguousarray(array).tobytes())
+                        file.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Could not save movie snapshot {path}: {e}")
+                return False
+            return True
+
+    def open_snapshot(self, path):
+        """
+        Map a snapshot written by save_snapshot() in place of loading from the
+        database. Arrays are read-only views of the file that the OS pages in as
+        searches touch them, so opening takes about the same time for any table
+        size. Call sync() afterwards to catch up with changes since the snapshot.
+
+        Returns:
+            bool: True if opened; False if the file is missing, unreadable or
+            was taken from another database.
+        """
+        with self._lock:
+            start = time.perf_counter()
+            try:
+                with open(path, "rb") as file:
+                    if file.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+                        print(f"{path} is not a movie snapshot in the current format.")
+                        return False
+                    (length,) = struct.unpack("<Q", file.read(8))
+                    header = json.loads(file.read(length))
+                buffer = np.memmap(path, dtype=np.uint8, mode="r")
+            except FileNotFoundError:
+                return False
+            except (OSError, ValueError, struct.error) as e:
+                print(f"Could not open movie snapshot {path}: {e}")
+                return False
+            if header["source"] != self._source():
+                print(f"Movie snapshot {path} is from another database; ignoring it.")
+                return False
+
+            base = _aligned(len(SNAPSHOT_MAGIC) + 8 + length)
+            arrays = {}
+            for name, (dtype, size, offset) in header["arrays"].items():
+                start_byte = base + offset
+                arrays[name] = buffer[start_byte:start_byte + size * np.dtype(dtype).itemsize].view(dtype)
+            data = {name: arrays[name] for name in NUMERIC_ARRAYS}
+            for name in STRING_COLUMNS:
+                data[name] = DictionaryColumn.from_buffers(arrays[f"{name}.codes"], arrays[f"{name}.offsets"],
+                                                           arrays[f"{name}.blob"], arrays[f"{name}.nulls"])
+
+            self._data = data
+            self.version = header["version"]
+            self.change_stamp = header["change_stamp"]
+            self._checked_at = 0.0   # let the first refresh check for changes
+            self.load_seconds = time.perf_counter() - start
+            return True
+
+    def _source(self):
+        """Which database the store was read from, to reject snapshots of another one."""
+        db = self.db
+        return f"{type(db).__name__}:{getattr(db, 'host', '')}/{getattr(db, 'database', '')}"
+
+    def can_answer(self, text_query=None, **query):
+        return self.loaded and not text_query
+
+    def fetch_movies(self, columns=None, search_column=None, search_value=None, range_filters=None,
+                     text_query=None, text_fields="all", boolean_mode=False, search_filters=None,
+                     after_id=None, limit=None):
+        """
+        Same filtering as BaseConnector.fetch_movies(); rows come back in id order,
+        the order paged queries use.
+
+        Args:
+            after_id (int): Only rows with a greater id.
+            limit (int): Build at most this many rows.
+
+        Returns:
+            list: Matching rows as tuples of the requested columns, or None if the
+            store is not loaded or the query needs the database (full-text search).
+        """
+        if not self.can_answer(text_query=text_query):
+            return None
+
+        # One consistent set of arrays for the whole search: sync() may swap
+        # _data from a worker thread meanwhile.
+        data = self._data
+        mask = np.ones(len(data["id"]), dtype=bool)
+
+        searches = list(search_filters or [])
+        if search_column and search_value:
+            searches.insert(0, (search_column, search_value))
+        for column, value in searches:
+            if value:
+                mask &= self._search_mask(data, column, value)
+
+        for column, (low, high) in (range_filters or {}).items():
+            if column not in RANGE_COLUMNS:
+                raise ValueError(f"Range filter not supported on column: {column}")
+            if column == "released_year":
+                values = data["released_year"]
+                mask &= data["year_valid"]
+            else:
+                values = data["rating32"]
+                low = None if low is None else np.float32(low)
+                high = None if high is None else np.float32(high)
+            # NaN compares false, so NULL ratings drop out like in SQL.
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+
+        if after_id is not None:
+            mask &= data["id"] > after_id
+        rows = np.flatnonzero(mask)
+        if limit is not None:
+            rows = rows[:limit]
+        return list(zip(*(self._take(data, column, rows) for column in (columns or MOVIE_COLUMNS))))
+
+    def fetch_movies_page(self, columns=None, page_size=200, page_token=None, **query):
+        """
+        One page of fetch_movies() results, like BaseConnector.fetch_movies_page(),
+        so only the rows shown are turned into tuples. Tokens are the store's own
+        (the last id shown) and are not interchangeable with the database's.
+
+        Returns:
+            tuple: (rows, next_page_token); next_page_token is None on the last
+            page, rows is None if the store cannot answer the query.
+        """
+        rows = self.fetch_movies(["id"] + list(columns or MOVIE_COLUMNS), after_id=page_token,
+                                 limit=page_size + 1, **query)
+        if rows is None:
+            return None, None
+        next_token = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_token = rows[-1][0]
+        return [row[1:] for row in rows], next_token
+
+    def _search_mask(self, data, search_column, search_value):
+        search_columns = [search_column] if isinstance(search_column, str) else list(search_column)
+        term = search_value.casefold()
+        words = name_words(term)
+
+        if self.db.normalized and words and all(col in NORMALIZED_COLUMNS for col in search_columns):
+            # Mirrors the normalized lookups: genres are matched one name at a time,
+            # and every term word has to start a word of the name.
+            def predicate(value, col):
+                names = value.split(",") if col == "genre" else [value]
+                for name in names:
+                    name_set = name_words(name)
+                    if all(any(word.startswith(prefix) for word in name_set) for prefix in words):
+                        return True
+                return False
+        else:
+            def predicate(value, col):
+                return term in value
+
+        mask = np.zeros(len(data["id"]), dtype=bool)
+        for col in search_columns:
+            mask |= data[col].match(lambda value: predicate(value, col))
+        return mask
+
+    def _take(self, data, column, rows):
+        if column == "id":
+            return data["id"][rows].tolist()
+        if column in STRING_COLUMNS:
+            return data[column].take(rows)
+        if column == "released_year":
+            values = data["released_year"][rows].astype(object)
+            values[~data["year_valid"][rows]] = None
+            return values.tolist()
+        if column == "imdb_rating":
+            values = data["imdb_rating"][rows].astype(object)
+            values[np.isnan(data["imdb_rating"][rows])] = None
+            return values.tolist()
+        raise ValueError(f"Unknown movies column: {column}")
+
+def _version_key(version):
+    """movies_version() as stored in the store and its snapshots (JSON-safe)."""
+    count, max_id, modified = version
+    return [count, max_id, None if modified is None else str(modified)]
+
+def _aligned(size):
+    return -(-size // SNAPSHOT_ALIGN) * SNAPSHOT_ALIGN
@@ -0,0 +1,179 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QSortFilterProxyModel, Qt
+
+HEADER_LABELS = {
+    "series_title": "Title",
+    "released_year": "Year",
+    "genre": "Genre",
+    "imdb_rating": "Rating",
+    "director": "Director",
+    "star1": "Star 1",
+    "star2": "Star 2",
+    "star3": "Star 3",
+}
+
+
+class MovieTableModel(QAbstractTableModel):
+    """
+    Read-only table model over raw result rows.
+
+    Cells are only formatted when the view asks for them, so the cost of showing
+    a result set is proportional to the visible rows, not the total row count.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._columns = []
+        self._page_loader = None
+        self._has_more = False
+        self._loading = False
+
+    def set_results(self, rows, columns, page_loader=None, has_more=False):
+        """
+        Replace the model contents.
+
+        Args:
+            rows (list): Result rows as tuples.
+            columns (list): Database column names, one per tuple element.
+            page_loader (callable): Returns (rows, has_more) for the next page; called
+                by the view through fetchMore() when the user scrolls to the end. It
+                may instead start loading in the background and return None, then
+                deliver the page with page_loaded().
+            has_more (bool): Whether page_loader has more rows to give.
+        """
+        self.beginResetModel()
+        self._rows = list(rows or [])
+        self._columns = list(columns)
+        self._page_loader = page_loader
+        self._has_more = has_more and page_loader is not None
+        self._loading = False
+        self.endResetModel()
+
+    def clear(self):
+        self.set_results([], [])
+
+    def append_rows(self, rows):
+        if not rows:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def page_loaded(self, rows, has_more):
+        """Deliver a page requested by a background page_loader."""
+        self._loading = False
+        self._has_more = has_more and self._page_loader is not None
+        self.append_rows(rows)
+
+    def rows(self):
+        return self._rows
+
+    def columns(self):
+        return self._columns
+
+    def cell(self, row, column):
+        """Raw value of a cell, as returned by the database."""
+        return self._rows[row][column]
+
+    def header_labels(self):
+        return [HEADER_LABELS.get(col, col) for col in self._columns]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        return str(self._rows[index.row()][index.column()])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return HEADER_LABELS.get(self._columns[section], self._columns[section])
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more and not self._loading
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = self._page_loader()
+        if page is None:
+            self._loading = True
+            return
+        rows, self._has_more = page
+        self.append_rows(rows)
+
+
+class MovieFilterProxy(QSortFilterProxyModel):
+    """
+    Column selection, sorting and a text filter over a MovieTableModel.
+
+    All three work on the rows already fetched, so changing them never needs
+    another query. Sorting compares raw values (numbers numerically, NULLs first);
+    the text filter matches a substring of any visible cell, ignoring case.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._visible_columns = None   # None shows every column
+        self._filter_text = ""
+
+    def set_visible_columns(self, columns):
+        self._visible_columns = set(columns)
+        self.invalidateColumnsFilter()
+        # The filter only looks at visible columns.
+        if self._filter_text:
+            self.invalidateRowsFilter()
+
+    def set_filter_text(self, text):
+        self._filter_text = text.strip().casefold()
+        self.invalidateRowsFilter()
+
+    def filterAcceptsColumn(self, source_column, source_parent):
+        if self._visible_columns is None:
+            return True
+        return self.sourceModel().columns()[source_column] in self._visible_columns
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        if not self._filter_text:
+            return True
+        model = self.sourceModel()
+        for column, name in enumerate(model.columns()):
+            if self._visible_columns is not None and name not in self._visible_columns:
+                continue
+            value = model.cell(source_row, column)
+            if value is not None and self._filter_text in str(value).casefold():
+                return True
+        return False
+
+    def lessThan(self, left, right):
+        model = self.sourceModel()
+        a = model.cell(left.row(), left.column())
+        b = model.cell(right.row(), right.column())
+        if a is None or b is None:
+            return a is None and b is not None
+        return a < b
+
+    def header_labels(self):
+        return [self.headerData(column, Qt.Horizontal) for column in range(self.columnCount())]
+
+    def visible_columns(self):
+        """movies column names of the shown columns, in view order."""
+        return [name for column, name in enumerate(self.sourceModel().columns())
+                if self.filterAcceptsColumn(column, QModelIndex())]
+
+    def visible_rows(self):
+        """Yield the shown rows, in view order, as tuples of the shown cells."""
+        model = self.sourceModel()
+        columns = [column for column in range(model.columnCount())
+                   if self.filterAcceptsColumn(column, QModelIndex())]
+        for row in range(self.rowCount()):
+            source_row = self.mapToSource(self.index(row, 0)).row()
+            yield tuple(model.cell(source_row, column) for column in columns)
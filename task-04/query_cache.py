@@ -0,0 +1,107 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Quoted literals are kept verbatim; whitespace runs elsewhere collapse to one space.
+_SQL_TOKEN = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\")|\s+")
+
+# Target table of an INSERT / REPLACE statement, whatever its modifiers.
+_WRITE_TARGET = re.compile(r"^\s*(?:INSERT|REPLACE)\b.*?\bINTO\s+`?(\w+)", re.IGNORECASE | re.DOTALL)
+
+
+def normalize_sql(sql):
+    """Collapse insignificant whitespace so formatting differences share a cache entry."""
+    return _SQL_TOKEN.sub(lambda match: match.group(1) or " ", sql).strip()
+
+
+def written_table(sql):
+    """Table an INSERT/REPLACE statement writes to (lower case), or None."""
+    match = _WRITE_TARGET.match(sql)
+    return match.group(1).lower() if match else None
+
+
+class QueryCache:
+    def __init__(self, max_entries=256, ttl=60):
+        """
+        Size-bounded LRU cache of query results with a time-to-live.
+
+        Args:
+            max_entries (int): Results kept; the least recently used is evicted first.
+            ttl (float): Seconds a result stays valid. This also bounds how stale a
+                result can get after writes made by other processes.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # key -> (rows, stored_at)
+        self._generation = 0
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._invalidations = 0
+
+    @staticmethod
+    def key(sql, params):
+        return normalize_sql(sql), tuple(params or ())
+
+    @property
+    def generation(self):
+        """Changes on every invalidate(); pass the value read before a query to put()."""
+        return self._generation
+
+    def get(self, key):
+        """
+        Returns:
+            list: A copy of the cached rows, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[1] > self.ttl:
+                del self._entries[key]
+                self._expirations += 1
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return list(entry[0])
+
+    def put(self, key, rows, generation):
+        """
+        Store rows for key, unless the cache was invalidated since generation was
+        read: the rows may predate the write that invalidated it.
+        """
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[key] = (list(rows), time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def invalidate(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._invalidations += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups else 0.0,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "invalidations": self._invalidations,
+            }
@@ -0,0 +1,123 @@
+import threading
+from itertools import count
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from base_connector import QueryHandle
+
+class _TaskSignals(QObject):
+    done = Signal(int, object)
+    error = Signal(int, str)
+
+class _QueryTask(QRunnable):
+    def __init__(self, ticket, fn, handle, signals):
+        super().__init__()
+        self.ticket = ticket
+        self.fn = fn
+        self.handle = handle
+        self.signals = signals
+
+    def run(self):
+        try:
+            result = self.fn(self.handle)
+        except Exception as e:
+            self.signals.error.emit(self.ticket, str(e))
+            return
+        self.signals.done.emit(self.ticket, result)
+
+class QueryRunner(QObject):
+    """
+    Runs database calls on a thread pool and delivers results on the GUI thread.
+
+    submit() returns a ticket; the call's result arrives through finished(ticket,
+    result), or failed(ticket, message) if it raised. A query still running after
+    timeout seconds, or cancelled with cancel(), is interrupted on the server and
+    reported through cancelled(ticket, reason) instead; its result is dropped.
+    """
+
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    cancelled = Signal(int, str)
+
+    def __init__(self, db, timeout=30, parent=None):
+        """
+        Args:
+            db (BaseConnector): Connector whose queries run here. It should be pooled:
+                each worker thread needs its own connection.
+            timeout (float): Seconds before a query is cancelled; None for no limit.
+        """
+        super().__init__(parent)
+        self.db = db
+        self.timeout = timeout
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(db.pool_size or 1)
+        self._tickets = count(1)
+        self._active = {}   # ticket -> (handle, timeout timer)
+        self._signals = _TaskSignals(self)
+        self._signals.done.connect(self._on_done)
+        self._signals.error.connect(self._on_error)
+
+    def submit(self, fn):
+        """
+        Run fn(handle) on a worker thread.
+
+        fn gets a QueryHandle to pass to the connector call, e.g.
+        lambda handle: db.fetch_movies_page(..., handle=handle).
+
+        Returns:
+            int: Ticket identifying this call in the signals.
+        """
+        ticket = next(self._tickets)
+        handle = QueryHandle()
+        timer = None
+        if self.timeout:
+            timer = QTimer(self)
+            timer.setSingleShot(True)
+            timer.timeout.connect(lambda: self.cancel(ticket, f"timed out after {self.timeout}s"))
+            timer.start(int(self.timeout * 1000))
+        self._active[ticket] = (handle, timer)
+        self.pool.start(_QueryTask(ticket, fn, handle, self._signals))
+        return ticket
+
+    def cancel(self, ticket, reason="cancelled"):
+        """Cancel a submitted call; no-op for finished or unknown tickets."""
+        entry = self._active.pop(ticket, None)
+        if entry is None:
+            return
+        handle, timer = entry
+        if timer:
+            timer.stop()
+            timer.deleteLater()
+        # A MySQL KILL QUERY opens a connection of its own; keep that off the GUI thread.
+        threading.Thread(target=self.db.cancel_query, args=(handle,), daemon=True).start()
+        self.cancelled.emit(ticket, reason)
+
+    def cancel_all(self, reason="cancelled"):
+        for ticket in list(self._active):
+            self.cancel(ticket, reason)
+
+    def shutdown(self, wait_ms=5000):
+        """Cancel everything and wait for the worker threads to finish."""
+        self.cancel_all("shutting down")
+        self.pool.waitForDone(wait_ms)
+
+    def is_running(self, ticket):
+        return ticket in self._active
+
+    def _finish(self, ticket):
+        entry = self._active.pop(ticket, None)
+        if entry is None:
+            return False   # cancelled or timed out: already reported
+        timer = entry[1]
+        if timer:
+            timer.stop()
+            timer.deleteLater()
+        return True
+
+    def _on_done(self, ticket, result):
+        if self._finish(ticket):
+            self.finished.emit(ticket, result)
+
+    def _on_error(self, ticket, message):
+        if self._finish(ticket):
+            self.failed.emit(ticket, message)
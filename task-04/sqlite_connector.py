@@ -0,0 +1,290 @@
+import itertools
+import os
+import re
+import sqlite3
+
+from base_connector import FULLTEXT_FIELDS, BaseConnector
+
+# Secondary indexes on movies: name -> indexed columns. SQLite has no FULLTEXT
+# indexes; text searches fall back to LIKE (see _text_condition()).
+MOVIE_INDEXES = {
+    "idx_movies_year": "released_year",
+    "idx_movies_rating": "imdb_rating",
+    "idx_movies_updated": "updated_at",
+}
+
+# updated_at values: UTC with milliseconds, so they sort as text.
+CHANGE_STAMP = "strftime('%Y-%m-%d %H:%M:%f', 'now')"
+
+# Terms of a MySQL boolean-mode query: optional +/- operator, then a quoted phrase or a word.
+BOOLEAN_TERM = re.compile(r'([+-]?)(?:"([^"]*)"|(\S+))')
+
+_memory_ids = itertools.count(1)
+
+class SQLiteConnector(BaseConnector):
+    """
+    Embedded SQLite backend with the same API as MySQLConnector.
+
+    Queries keep MySQL's %s placeholders and are translated to SQLite's ? style,
+    so callers and the importer's SQL work unchanged against either backend.
+    """
+
+    display_name = "SQLite database"
+    driver_errors = (sqlite3.Error,)
+    connection_lost_errors = ()   # in-process: a connection cannot drop out from under us
+
+    upsert_sql = """
+        INSERT INTO movies (series_title, released_year, genre, imdb_rating, director, star1, star2, star3, row_hash)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (series_title, COALESCE(released_year, 0)) DO UPDATE SET
+            genre = excluded.genre,
+            imdb_rating = excluded.imdb_rating,
+            director = excluded.director,
+            star1 = excluded.star1,
+            star2 = excluded.star2,
+            star3 = excluded.star3,
+            row_hash = excluded.row_hash
+    """
+
+    insert_ignore = "INSERT OR IGNORE"
+
+    def __init__(self, database="moviesdb.sqlite3", pool_size=None, pool_max_lifetime=3600, pool_timeout=10,
+                 normalized=False, busy_timeout=30, cache_size=None, cache_ttl=60, statement_cache_size=None):
+        """
+        Args:
+            database (str): Path of the database file, or ":memory:" for a private
+                in-memory database shared by this connector's connections.
+            pool_size (int): If set, use a bounded connection pool of this size
+                instead of a single shared connection.
+            pool_max_lifetime (float): Seconds before a pooled connection is recycled.
+            pool_timeout (float): Seconds to wait for a free pooled connection.
+            normalized (bool): Answer genre/director/star searches from the normalized
+                genres/people join tables instead of LIKE scans over the movies table.
+            busy_timeout (float): Seconds a connection waits for another one's write lock.
+            cache_size (int): If set, cache up to this many fetch_movies() results
+                (LRU; invalidated by batch_insert() into the movie tables).
+            cache_ttl (float): Seconds a cached result is reused.
+            statement_cache_size (int): Compiled statements sqlite3 keeps per connection
+                (its cached_statements; None keeps the default of 128, 0 disables it).
+                Queries are reused by their exact text, which _prepare() keeps stable.
+        """
+        super().__init__(pool_size=pool_size, pool_max_lifetime=pool_max_lifetime,
+                         pool_timeout=pool_timeout, normalized=normalized,
+                         cache_size=cache_size, cache_ttl=cache_ttl,
+                         statement_cache_size=statement_cache_size)
+        self.database = database
+        self.busy_timeout = busy_timeout
+        self._statements = {}
+        self._keepalive = None
+        if database == ":memory:":
+            # A named shared-cache database, so pooled connections see the same data.
+            # Shared-cache locks are table-level and fail instead of waiting, so
+            # the pool is kept to one connection.
+            self._uri = f"file:moviesdb_memory_{next(_memory_ids)}?mode=memory&cache=shared"
+            self.pool_size = min(pool_size, 1) if pool_size else pool_size
+        else:
+            self._uri = None
+
+    def connect(self):
+        """Open the database file (or the in-memory database)."""
+        if self._uri and self._keepalive is None:
+            # An in-memory database lives only while a connection to it is open.
+            self._keepalive = self._open_connection()
+        return super().connect()
+
+    def disconnect(self):
+        """Close the database connection."""
+        super().disconnect()
+        if self._keepalive is not None:
+            self._keepalive.close()
+            self._keepalive = None
+
+    def _open_connection(self):
+        options = {}
+        if self.statement_cache_size is not None:
+            options["cached_statements"] = self.statement_cache_size
+        connection = sqlite3.connect(self._uri or self.database, uri=self._uri is not None,
+                                     timeout=self.busy_timeout, check_same_thread=False, **options)
+        connection.execute("PRAGMA foreign_keys = ON")
+        return connection
+
+    def _connection_alive(self, connection):
+        try:
+            connection.total_changes
+        except sqlite3.ProgrammingError:
+            return False
+        return True
+
+    def _prepare(self, sql):
+        """Translate %s placeholders into SQLite's ? style."""
+        prepared = self._statements.get(sql)
+        if prepared is None:
+            prepared = self._statements[sql] = sql.replace("%s", "?")
+        return prepared
+
+    def _count_tables_sql(self, names):
+        quoted = ", ".join(f"'{name}'" for name in names)
+        return f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({quoted})"
+
+    def _count_columns_sql(self, table, names):
+        quoted = ", ".join(f"'{name}'" for name in names)
+        return f"SELECT COUNT(*) FROM pragma_table_info('{table}') WHERE name IN ({quoted})"
+
+    def _interrupt(self, connection):
+        connection.interrupt()
+
+    def _movies_modified(self):
+        if self._uri:
+            return None
+        # Commits touch the database file, or its write-ahead log in WAL mode.
+        stamps = [os.stat(path).st_mtime_ns for path in (self.database, self.database + "-wal")
+                  if os.path.exists(path)]
+        return max(stamps, default=None)
+
+    def _text_condition(self, text_query, text_fields, boolean_mode):
+        """
+        LIKE-based stand-in for MATCH ... AGAINST.
+
+        Natural-language mode matches rows containing any of the words. Boolean
+        mode understands +word (required), -word (excluded), "phrase" and word*
+        (prefix, which LIKE '%word%' already covers); when there are no required
+        terms at least one of the optional ones must match.
+        """
+        fields = FULLTEXT_FIELDS[text_fields].split(", ")
+
+        def contains(term):
+            return "(" + " OR ".join(f"{field} LIKE %s" for field in fields) + ")", [f"%{term}%"] * len(fields)
+
+        required, excluded, optional = [], [], []
+        for operator, phrase, word in BOOLEAN_TERM.findall(text_query):
+            term = phrase if phrase else word
+            if boolean_mode:
+                term = term.rstrip("*")
+            else:
+                operator = ""
+            if term:
+                {"+": required, "-": excluded, "": optional}[operator].append(term)
+
+        conditions, params = [], []
+        for term in required:
+            condition, condition_params = contains(term)
+            conditions.append(condition)
+            params.extend(condition_params)
+        for term in excluded:
+            condition, condition_params = contains(term)
+            conditions.append(f"NOT {condition}")
+            params.extend(condition_params)
+        if optional and not required:
+            parts = [contains(term) for term in optional]
+            conditions.append("(" + " OR ".join(condition for condition, _ in parts) + ")")
+            for _, condition_params in parts:
+                params.extend(condition_params)
+        if not conditions:
+            return "0", []
+        return "(" + " AND ".join(conditions) + ")", params
+
+    def create_movies_table(self):
+        """
+        Create movies, its updated_at change-tracking column and its secondary
+        indexes if they do not exist. SQLite has no ON UPDATE clause, so a
+        trigger stamps updated rows.
+        """
+        with self.checkout() as connection:
+            connection.execute(f"""
+                CREATE TABLE IF NOT EXISTS movies (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    series_title TEXT,
+                    released_year INTEGER,
+                    genre TEXT,
+                    imdb_rating REAL,
+                    director TEXT,
+                    star1 TEXT,
+                    star2 TEXT,
+                    star3 TEXT,
+                    updated_at TEXT DEFAULT ({CHANGE_STAMP})
+                )
+            """)
+            existing = [row[1] for row in connection.execute("PRAGMA table_info(movies)")]
+            if "updated_at" not in existing:
+                # ADD COLUMN only takes constant defaults; stamp new rows with a trigger instead.
+                connection.execute("ALTER TABLE movies ADD COLUMN updated_at TEXT")
+                connection.execute(f"UPDATE movies SET updated_at = {CHANGE_STAMP}")
+                connection.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS movies_inserted AFTER INSERT ON movies
+                    WHEN NEW.updated_at IS NULL BEGIN
+                        UPDATE movies SET updated_at = {CHANGE_STAMP} WHERE id = NEW.id;
+                    END
+                """)
+            connection.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS movies_updated
+                AFTER UPDATE OF series_title, released_year, genre, imdb_rating, director, star1, star2, star3
+                ON movies BEGIN
+                    UPDATE movies SET updated_at = {CHANGE_STAMP} WHERE id = NEW.id;
+                END
+            """)
+            for name, columns in MOVIE_INDEXES.items():
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON movies ({columns})")
+            connection.commit()
+
+    def ensure_incremental_schema(self):
+        """
+        Add the row_hash column and the (series_title, released_year) unique key
+        needed for incremental imports. Existing pieces are left alone.
+        """
+        with self.checkout() as connection:
+            columns = [row[1] for row in connection.execute("PRAGMA table_info(movies)")]
+            if "row_hash" not in columns:
+                connection.execute("ALTER TABLE movies ADD COLUMN row_hash TEXT")
+            try:
+                # NULLs never collide in a unique index, so rows without a year
+                # would be inserted again on every run; key them as year 0.
+                connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_movies_title_year_key "
+                                   "ON movies (series_title, COALESCE(released_year, 0))")
+            except sqlite3.IntegrityError:
+                print("movies already contains duplicate (title, year) rows; "
+                      "remove them before an incremental import.")
+                raise
+            connection.execute("DROP INDEX IF EXISTS uq_movies_title_year")
+            connection.commit()
+
+    def create_normalized_tables(self):
+        """
+        Create the genre/people lookup tables, their word tables and the join
+        tables. Names and words compare case-insensitively, like MySQL's default
+        collation; for the words that is also what lets SQLite answer the
+        'word%' LIKE lookups from the primary key.
+        """
+        with self.checkout() as connection:
+            connection.executescript("""
+                CREATE TABLE IF NOT EXISTS genres (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL COLLATE NOCASE UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS people (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL COLLATE NOCASE UNIQUE
+                );
+                CREATE TABLE IF NOT EXISTS movie_genres (
+                    movie_id INTEGER NOT NULL REFERENCES movies (id) ON DELETE CASCADE,
+                    genre_id INTEGER NOT NULL REFERENCES genres (id) ON DELETE CASCADE,
+                    PRIMARY KEY (genre_id, movie_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_movie_genres_movie ON movie_genres (movie_id);
+                CREATE TABLE IF NOT EXISTS movie_people (
+                    movie_id INTEGER NOT NULL REFERENCES movies (id) ON DELETE CASCADE,
+                    person_id INTEGER NOT NULL REFERENCES people (id) ON DELETE CASCADE,
+                    role TEXT NOT NULL CHECK (role IN ('director', 'star')),
+                    PRIMARY KEY (person_id, role, movie_id)
+                );
+                CREATE INDEX IF NOT EXISTS idx_movie_people_movie ON movie_people (movie_id);
+                CREATE TABLE IF NOT EXISTS genre_words (
+                    word TEXT NOT NULL COLLATE NOCASE,
+                    genre_id INTEGER NOT NULL REFERENCES genres (id) ON DELETE CASCADE,
+                    PRIMARY KEY (word, genre_id)
+                );
+                CREATE TABLE IF NOT EXISTS person_words (
+                    word TEXT NOT NULL COLLATE NOCASE,
+                    person_id INTEGER NOT NULL REFERENCES people (id) ON DELETE CASCADE,
+                    PRIMARY KEY (word, person_id)
+                );
+            """)
@@ -0,0 +1,107 @@
+import re
+import time
+from bisect import bisect_left
+
+from base_connector import MOVIE_COLUMNS
+
+# Search fields -> the movies columns they cover. Each column is indexed on its
+# own so a multi-word query must match within one name, not across the stars.
+INDEXED_FIELDS = {
+    "title": ["series_title"],
+    "director": ["director"],
+    "actor": ["star1", "star2", "star3"],
+}
+
+TOKEN = re.compile(r"\w+")
+
+def tokenize(text):
+    return TOKEN.findall(text.casefold()) if text else []
+
+class TokenIndex:
+    """
+    Inverted index from word prefixes to movies, for search-as-you-type.
+
+    Every word of the indexed columns maps to the set of rows containing it;
+    each column also keeps its words sorted, so all words starting with a prefix
+    are found with one bisect. A query matches rows where every query word is a
+    prefix of some word in the same column ("chris nol" finds "Christopher Nolan").
+    """
+
+    def __init__(self):
+        self.rows = []           # full movies rows (MOVIE_COLUMNS), in id order
+        self.build_seconds = 0.0
+        self._postings = {}      # column -> {word: set of row numbers}
+        self._words = {}         # column -> sorted list of words
+
+    def __len__(self):
+        return len(self.rows)
+
+    def build(self, db):
+        """
+        Fetch every movie once and index it, replacing any previous contents.
+
+        Args:
+            db: A connector, or a loaded MovieStore to index without a database query.
+
+        Returns:
+            bool: True on success.
+        """
+        start = time.perf_counter()
+        rows = db.fetch_movies(["id"] + MOVIE_COLUMNS)
+        if rows is None:
+            return False
+        rows.sort(key=lambda row: row[0])
+
+        postings = {}
+        for columns in INDEXED_FIELDS.values():
+            for column in columns:
+                position = MOVIE_COLUMNS.index(column) + 1
+                words = postings[column] = {}
+                for number, row in enumerate(rows):
+                    for word in tokenize(row[position]):
+                        words.setdefault(word, set()).add(number)
+
+        self.rows = [row[1:] for row in rows]
+        self._postings = postings
+        self._words = {column: sorted(words) for column, words in postings.items()}
+        self.build_seconds = time.perf_counter() - start
+        return True
+
+    def search(self, field, query, limit=None):
+        """
+        Rows whose field matches every word of query by prefix.
+
+        Args:
+            field (str): "title", "director" or "actor".
+            query (str): Words typed so far.
+            limit (int): Return at most this many rows.
+
+        Returns:
+            list: Matching movies rows (all MOVIE_COLUMNS) in id order.
+        """
+        terms = tokenize(query)
+        if not terms:
+            return []
+
+        matches = set()
+        for column in INDEXED_FIELDS[field]:
+            found = None
+            # Longest words first: they have the fewest candidates to intersect.
+            for term in sorted(terms, key=len, reverse=True):
+                rows = self._prefix_rows(column, term)
+                found = rows if found is None else found & rows
+                if not found:
+                    break
+            matches |= found
+        numbers = sorted(matches)[:limit]
+        return [self.rows[number] for number in numbers]
+
+    def _prefix_rows(self, column, prefix):
+        words = self._words[column]
+        postings = self._postings[column]
+        rows = set()
+        index = bisect_left(words, prefix)
+        while index < len(words) and words[index].startswith(prefix):
+            rows |= postings[words[index]]
+            index += 1
+        return rows